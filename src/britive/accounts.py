@@ -19,7 +19,7 @@ class Accounts:
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(),
             'includeMembers': include_associations
         }
 
@@ -46,7 +46,7 @@ class Accounts:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
 
         environment_id = environment_id or self.britive.get_root_environment_group(application_id)
@@ -72,7 +72,7 @@ class Accounts:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
 
         environment_id = environment_id or self.britive.get_root_environment_group(application_id)
@@ -162,7 +162,7 @@ class Accounts:
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(),
             'query': 'available'
         }
 
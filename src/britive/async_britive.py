@@ -0,0 +1,798 @@
+import asyncio
+import codecs
+import contextvars
+import functools
+import inspect
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+from .britive import Britive
+from .exceptions import DeadlineExceeded, InternalServerError, ServiceUnavailable, allowed_exceptions
+from .helpers import responses
+from .helpers import deadline as deadlines
+from .helpers.circuit_breaker import CircuitBreakers, endpoint_family, failure_status_codes
+from .helpers.feature_caches import FeatureCache
+from .helpers.hedging import HedgingPolicy
+from .helpers.hooks import Hooks
+from .helpers.metrics import Metrics
+from .helpers.page_size import AdaptivePageSize
+from .helpers.polling import PollingStrategy
+from .helpers.rate_limit import RateLimiter
+from .helpers.response_cache import ResponseCache
+
+
+# mirror the retry behavior of the `requests` session used by `Britive` (urllib3 `Retry` defaults) - retryable status
+# codes and transport errors are retried up to `retry_total` times
+retry_total = 5
+retry_backoff_factor = 1
+retry_backoff_max = 120
+retry_status_forcelist = [429, 500, 502, 503, 504]
+retry_allowed_methods = ['HEAD', 'GET', 'PUT', 'DELETE', 'OPTIONS', 'TRACE']
+
+
+_done = object()
+
+# the SDK method (for example `users.list`) which scheduled the coroutine currently running, reported to hooks
+_sdk_method = contextvars.ContextVar('britive_sdk_method', default=None)
+
+
+async def _anext(iterator):
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _done
+
+
+async def _with_sdk_method(coroutine, sdk_method):
+    # runs as its own task so setting the context variable does not leak into other coroutines
+    _sdk_method.set(sdk_method)
+    return await coroutine
+
+
+class _BridgedBritive(Britive):
+    """
+    Synchronous view of an `AsyncBritive` client.
+
+    This allows the existing resource classes (`Users`, `MyAccess`, etc.) to be used as-is. Every HTTP call made
+    through this object is scheduled on the event loop of the owning `AsyncBritive` instance and only the calling
+    worker thread waits on the result.
+    """
+
+    def __init__(self, async_britive, **kwargs):
+        self.async_britive = async_britive
+        super().__init__(query_features=False, **kwargs)
+
+    def get(self, url, params=None):
+        """Internal use only."""
+
+        return self.__run(self.async_britive.get(url, params=params))
+
+    def iter_get(self, url, params=None):
+        """Internal use only."""
+
+        return self.__iterate(self.async_britive.iter_get(url, params=params), self.__sdk_method())
+
+    def iter_text(self, url, params=None, chunk_size=65536):
+        """Internal use only."""
+
+        return self.__iterate(
+            self.async_britive.iter_text(url, params=params, chunk_size=chunk_size),
+            self.__sdk_method()
+        )
+
+    def __sdk_method(self):
+        return self.resolve_sdk_method() if self.hooks.active else None
+
+    def __run(self, coroutine, sdk_method=None):
+        if self.hooks.active:
+            coroutine = _with_sdk_method(coroutine, sdk_method or self.resolve_sdk_method())
+        return self.async_britive.run_threadsafe(coroutine)
+
+    def __iterate(self, async_iterator, sdk_method):
+        # `sdk_method` is resolved by the caller as the generator is consumed after the resource method has returned
+        while True:
+            item = self.__run(_anext(async_iterator), sdk_method)
+            if item is _done:
+                return
+            yield item
+
+    def post(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return self.__run(self.async_britive.post(url, params=params, data=data, json=json))
+
+    def patch(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return self.__run(self.async_britive.patch(url, params=params, data=data, json=json))
+
+    def put(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return self.__run(self.async_britive.put(url, params=params, data=data, json=json))
+
+    def delete(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return self.__run(self.async_britive.delete(url, params=params, data=data, json=json))
+
+    def patch_upload(self, url, file_content_as_str, content_type, filename):
+        """Internal use only."""
+
+        return self.__run(
+            self.async_britive.patch_upload(url, file_content_as_str, content_type, filename)
+        )
+
+    def post_upload(self, url, params=None, files=None):
+        """Internal use only."""
+
+        return self.__run(self.async_britive.post_upload(url, params=params, files=files))
+
+
+class _AsyncResource:
+    """
+    Awaitable view of one of the resource classes (`Users`, `MyAccess`, etc.).
+
+    Methods of the wrapped resource become coroutine functions. Methods which return a generator (`stream=True`)
+    instead return an async generator once awaited. Nested resources (for example
+    `secrets_manager.vaults`) are wrapped in the same manner and plain attributes are returned as-is.
+    """
+
+    def __init__(self, async_britive, resource):
+        self._async_britive = async_britive
+        self._resource = resource
+
+    def __getattr__(self, name):
+        attr = getattr(self._resource, name)
+        if callable(attr):
+            @functools.wraps(attr)
+            async def method(*args, **kwargs):
+                result = await self._async_britive.run_in_worker(functools.partial(attr, *args, **kwargs))
+                if inspect.isgenerator(result):  # streamed results (`stream=True`) become async generators
+                    return self._async_britive.iterate(result)
+                return result
+            return method
+        if hasattr(attr, 'britive'):  # nested resource
+            return _AsyncResource(self._async_britive, attr)
+        return attr
+
+
+class AsyncBritive:
+    """
+    Pure Python asyncio implementation for interacting with the Britive API.
+
+    This class mirrors the `Britive` class. The same resources are available (`users`, `my_access`, `my_secrets`,
+    `secrets_manager`, `reports`, `audit_logs`, etc.) with the same methods and arguments, except each method must be
+    awaited.
+
+        async with AsyncBritive() as britive:
+            users = await britive.users.list()
+
+    All HTTP traffic is sent over a single `httpx.AsyncClient` which provides connection pooling and HTTP keep-alive.
+    Pagination (of all types the Britive API uses) is handled by awaiting each page on the event loop so no thread is
+    ever blocked waiting on the network. The lightweight, non-network logic of each resource method (building
+    request bodies, inspecting responses, etc.) runs in a worker thread and hands every HTTP call back to the event
+    loop.
+
+    Each resource method holds a worker thread until it returns, including while it waits between status checks
+    (polling during a checkout, approval, credential or secret retrieval, etc.). The number of resource methods in
+    flight at once is therefore capped at `max_workers` (32 by default) and further calls wait for a worker. Raise
+    `max_workers` to run more polling calls (for example thousands of concurrent checkouts) at once - the HTTP requests
+    themselves are still limited by `max_connections`.
+
+    `httpx` is not a hard requirement of this SDK but is required for this class.
+
+    Authentication and tenant resolution work the same as for the `Britive` class. Feature flags are queried when
+    entering the async context manager (or by awaiting `load_features()`) so the constructor never performs network
+    I/O on the event loop.
+    """
+
+    def __init__(self, tenant: str = None, token: str = None, query_features: bool = True,
+                 token_federation_provider: str = None, token_federation_provider_duration_seconds: int = 900,
+                 max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 max_workers: int = 32, pagination_concurrency: int = 1,
+                 page_size: Union[int, str, AdaptivePageSize] = None, polling: PollingStrategy = None,
+                 metrics: Metrics = None, hooks: Hooks = None, feature_cache: FeatureCache = None,
+                 validate_tenant: bool = True, rate_limit: Union[float, RateLimiter] = None,
+                 timeout: Union[float, tuple] = None, hedging: HedgingPolicy = None,
+                 circuit_breakers: CircuitBreakers = None, response_cache: ResponseCache = None):
+        """
+        Instantiate an authenticated interface that can be used to communicate with the Britive API via asyncio.
+
+        :param tenant: The name of the Britive tenant. If not provided then environment variable BRITIVE_TENANT will
+            be used.
+        :param token: The API token. If not provided then environment variable BRITIVE_API_TOKEN will be used.
+        :param query_features: Indicates whether the SDK will query for features of the tenant when entering the async
+            context manager. True by default.
+        :param token_federation_provider: The federation provider to use to source the token. Details of what can be
+            provided can be found in the documentation for the Britive.source_federation_token_from method.
+        :param token_federation_provider_duration_seconds: Only applicable for the AWS provider. Specify the number of
+            seconds for which the generated token is valid. Defaults to 900 seconds (15 minutes).
+        :param max_connections: The maximum number of concurrent connections to the tenant. Defaults to 100.
+        :param max_keepalive_connections: The maximum number of idle connections kept alive in the pool. Defaults
+            to 20.
+        :param keepalive_expiry: The number of seconds an idle connection is kept alive. Defaults to 30 seconds.
+        :param max_workers: The maximum number of resource methods that can be in flight at once. Each method holds a
+            worker thread until it returns, including while polling, so size this for the number of concurrent
+            checkouts, approvals, etc. Defaults to 32.
+        :param pagination_concurrency: The maximum number of pages to retrieve concurrently for list endpoints which
+            report the total number of records with the first page. See `Britive` for details. Defaults to 1.
+        :param page_size: The number of records to request per page for list endpoints, or `adaptive`. See `Britive`
+            for details.
+        :param polling: The strategy used to wait between status checks while polling. See `Britive` for details.
+        :param metrics: Where to record per endpoint request statistics. See `Britive` for details.
+        :param hooks: Callbacks invoked around each request. See `Britive` for details.
+        :param feature_cache: Where to cache the features of the tenant. See `Britive` for details.
+        :param validate_tenant: Whether to validate the tenant via DNS. See `Britive` for details.
+        :param rate_limit: The number of requests per second to allow, or a `britive.helpers.rate_limit.RateLimiter`.
+            See `Britive` for details.
+        :param timeout: The number of seconds to wait to establish a connection and for the server to send data, as a
+            single value for both or a tuple of (connect, read). See `Britive` for details.
+        :param hedging: A `britive.helpers.hedging.HedgingPolicy` which sends a second `GET` request when the first has
+            not responded in time, using whichever responds first and cancelling the other. See `Britive` for details.
+        :param circuit_breakers: A `britive.helpers.circuit_breaker.CircuitBreakers` which fails requests to a failing
+            backend fast with `CircuitOpen`. See `Britive` for details.
+        :param response_cache: A `britive.helpers.response_cache.ResponseCache` which caches the responses of endpoints
+            which rarely change. See `Britive` for details.
+        :raises: TenantMissingError, TokenMissingError
+        """
+
+        # httpx is not a hard requirement of this SDK but is required for the async client so checking to ensure
+        # it exists
+        try:
+            import httpx
+        except ImportError:
+            raise Exception('httpx required - please install httpx package to use the AsyncBritive client')
+
+        self._sync = _BridgedBritive(
+            self,
+            tenant=tenant,
+            token=token,
+            token_federation_provider=token_federation_provider,
+            token_federation_provider_duration_seconds=token_federation_provider_duration_seconds,
+            page_size=page_size,
+            polling=polling,
+            metrics=metrics,
+            hooks=hooks,
+            feature_cache=feature_cache,
+            validate_tenant=validate_tenant,
+            rate_limit=rate_limit,
+            timeout=timeout,
+            hedging=hedging,
+            circuit_breakers=circuit_breakers,
+            response_cache=response_cache
+        )
+        self.tenant = self._sync.tenant
+        self.base_url = self._sync.base_url
+        self.query_features = query_features
+        self.feature_flags = {}
+        self.pagination_concurrency = pagination_concurrency
+        self.page_size = self._sync.page_size
+        self.metrics = self._sync.metrics
+        self.hooks = self._sync.hooks
+        self._adaptive_page_size_errors = (httpx.TimeoutException, InternalServerError, ServiceUnavailable)
+        self._httpx_timeout = httpx.Timeout
+        self._httpx_timeout_errors = httpx.TimeoutException
+        self._httpx_transport_errors = httpx.TransportError
+        # as with urllib3, errors before the request was sent are always retried and errors after it was sent are only
+        # retried for idempotent methods
+        self._httpx_connect_errors = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+        self._httpx_read_errors = (
+            httpx.ReadError, httpx.ReadTimeout, httpx.WriteError, httpx.WriteTimeout, httpx.RemoteProtocolError
+        )
+
+        # re-use the headers computed by `Britive` (auth token type, user agent, etc.) - content type is set per
+        # request as httpx computes the appropriate value for multipart uploads
+        headers = {k: v for k, v in self._sync.session.headers.items() if k.lower() != 'content-type'}
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            verify=self._sync.session.verify,
+            timeout=None,  # set per request from the `timeout` of `Britive` and the deadline of the call
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='britive-async')
+        self._loop = None
+        self._resources = {}
+
+    async def __aenter__(self):
+        if self.query_features:
+            await self.load_features()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP connection pool and worker threads."""
+
+        await self.client.aclose()
+        self._executor.shutdown(wait=False)
+
+    def __getattr__(self, name):
+        # only called when the attribute is not found the normal way - expose the resources of the `Britive` class
+        if name.startswith('_'):
+            raise AttributeError(f"'AsyncBritive' object has no attribute '{name}'")
+        if name not in self._resources:
+            resource = getattr(self._sync, name)
+            if callable(resource) or not hasattr(resource, 'britive'):
+                raise AttributeError(f"'AsyncBritive' object has no attribute '{name}'")
+            self._resources[name] = _AsyncResource(self, resource)
+        return self._resources[name]
+
+    @staticmethod
+    def deadline(seconds: float):
+        """
+        Limit the SDK calls made within the context to `seconds` in total. See `Britive.deadline` for details.
+
+        `with britive.deadline(30): await britive.my_access.checkout(...)`
+
+        :param seconds: The time budget in seconds.
+        :return: Context manager.
+        """
+
+        return deadlines.deadline(seconds)
+
+    async def load_features(self) -> dict:
+        """
+        Query for the features of the tenant and configure the resources accordingly (profiles v1 vs v2, etc.).
+
+        :return: Dict of feature names to whether the feature is enabled.
+        """
+
+        cache = self._sync.feature_cache
+        features = cache.get(self.tenant) if cache else None
+        if features is None:
+            features = await self.features()
+            if cache:
+                cache.set(self.tenant, features)
+        self.feature_flags = features
+        self._sync.feature_flags = self.feature_flags
+        # profiles are re-constructed on next access for the version of profiles enabled for the tenant
+        self._sync.__dict__.pop('profiles', None)
+        self._resources.pop('profiles', None)
+        return self.feature_flags
+
+    async def features(self):
+        features = {}
+        for feature in await self.get(f'{self.base_url}/features'):
+            features[feature['name']] = feature['enabled']
+        return features
+
+    async def run_in_worker(self, func):
+        """Internal use only."""
+
+        self._loop = asyncio.get_event_loop()
+        # run in a copy of the current context so the deadline of the call (if any) applies in the worker thread
+        return await self._loop.run_in_executor(self._executor, contextvars.copy_context().run, func)
+
+    async def iterate(self, generator):
+        """Internal use only."""
+
+        while True:
+            item = await self.run_in_worker(functools.partial(next, generator, _done))
+            if item is _done:
+                return
+            yield item
+
+    def request_timeout(self):
+        """Internal use only."""
+
+        timeout = self._sync.request_timeout()  # lowered to the time remaining before the deadline of the call
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx_timeout(read, connect=connect)
+        return self._httpx_timeout(timeout)
+
+    def run_threadsafe(self, coroutine):
+        """Internal use only."""
+
+        if self._loop is None or not self._loop.is_running():
+            coroutine.close()
+            raise RuntimeError('AsyncBritive resource methods must be awaited from within a running event loop')
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:  # no running loop in this thread which is expected for worker threads
+            running_loop = None
+        if running_loop is self._loop:
+            coroutine.close()
+            raise RuntimeError('synchronous calls cannot be made from the event loop thread - await the method')
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def get(self, url, params=None):
+        """Internal use only."""
+
+        cache = self._sync.response_cache
+        ttl = cache.ttl(url) if cache else None
+        if not ttl:
+            return await self.__request('get', url, params=params)
+        key = self._sync.response_cache_key(url, params)
+        result = cache.get(key)
+        if result is None:
+            result = await self.__request('get', url, params=params)
+            if result is not None:
+                cache.set(key, result, ttl, endpoint_family(url))
+        return result
+
+    async def iter_get(self, url, params=None):
+        """
+        Internal use only.
+
+        Same as `get` but returns an async generator which yields individual records as each page of results is
+        retrieved. See `Britive.iter_get` for details.
+        """
+
+        pages = 0
+        try:
+            async for pagination_type, result in self.__pages('get', url, params=params):
+                pages += 1
+                if pagination_type == 'none':
+                    if isinstance(result, list):
+                        for item in result:
+                            yield item
+                    elif result is not None:
+                        yield result
+                    return
+                for item in result:
+                    yield item
+        finally:
+            if self.metrics and pages:
+                self.metrics.record_call('get', url, pages)
+
+    async def iter_text(self, url, params=None, chunk_size=65536):
+        """
+        Internal use only.
+
+        Streams the body of a GET request, yielding it as decoded (UTF-8) text chunks as the bytes arrive.
+        """
+
+        # sent through `__send` (with the body left unread) so streamed reads are retried, rate limited, measured,
+        # hooked, etc. the same as every other request
+        response = await self.__send('get', url, params=params, stream=True)
+        try:
+            if response.status_code in allowed_exceptions.keys():
+                await response.aread()
+                responses.check_response_for_error(response)
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                if self.metrics:
+                    self.metrics.record_bytes('get', url, len(chunk))
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+        finally:
+            await response.aclose()
+
+    async def post(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return await self.__request('post', url, params=params, data=data, json=json)
+
+    async def patch(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return await self.__request('patch', url, params=params, data=data, json=json)
+
+    async def put(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return await self.__request('put', url, params=params, data=data, json=json)
+
+    async def delete(self, url, params=None, data=None, json=None):
+        """Internal use only."""
+
+        return await self.__request('delete', url, params=params, data=data, json=json)
+
+    async def patch_upload(self, url, file_content_as_str, content_type, filename):
+        """Internal use only."""
+
+        files = {
+            filename: (f'{filename}.xml', file_content_as_str, content_type)
+        }
+        response = await self.__send('patch', url, files=files)
+        try:
+            return response.json()
+        except ValueError:  # if we cannot decode json then the response isn't json
+            return response.content.decode('utf-8')
+
+    async def post_upload(self, url, params=None, files=None):
+        """Internal use only."""
+
+        response = await self.__send('post', url, params=params, files=files)
+        try:
+            return response.json()
+        except ValueError:  # if we cannot decode json then the response isn't json
+            return response.content.decode('utf-8')
+
+    async def __send(self, method, url, params=None, data=None, json=None, files=None, stream=False):
+        headers = None if files else {'Content-Type': 'application/json'}
+        hooks = self.hooks.active
+        sdk_method = _sdk_method.get()
+        breaker = self._sync.circuit_breakers.breaker(url) if self._sync.circuit_breakers else None
+        if breaker:
+            breaker.allow()  # fail fast if the backend is known to be failing
+        outcome = None  # the result recorded by the circuit breaker - None if the request did not complete
+        try:
+            attempt = 0
+            while True:
+                limiter = self._sync.rate_limiter
+                if limiter:
+                    wait = limiter.reserve()
+                    if wait:
+                        await asyncio.sleep(wait)
+                if hooks:
+                    self.hooks.emit('before_request', {
+                        'sdk_method': sdk_method,
+                        'method': method,
+                        'url': url,
+                        'params': params
+                    })
+                request = functools.partial(
+                    self.__stream_request if stream else self.client.request,
+                    method.upper(),
+                    url,
+                    params=params,
+                    data=data,
+                    json=json,
+                    files=files,
+                    headers=headers,
+                    timeout=self.request_timeout()
+                )
+                hedging = self._sync.hedging
+                endpoint = hedging.enabled(method, url) if hedging and not stream else None
+                start = time.monotonic()
+                try:
+                    response = await (self.__hedged_request(hedging, endpoint, request) if endpoint else request())
+                except Exception as e:
+                    # other errors (deadline exceeded, etc.) are not counted by the circuit breaker
+                    outcome = False if isinstance(e, self._httpx_transport_errors) else None
+                    elapsed = time.monotonic() - start
+                    if self.metrics:
+                        self.metrics.record_request(method, url, 'error', elapsed)
+                    if hooks:
+                        self.__after_response(sdk_method, method, url, None, elapsed, e)
+                    self.__invalidate_responses(method, url)
+                    if isinstance(e, self._httpx_timeout_errors):
+                        try:
+                            deadlines.remaining()  # report a timeout caused by the deadline of the call as such
+                        except DeadlineExceeded as exceeded:
+                            raise exceeded from e
+                    retryable = isinstance(e, self._httpx_connect_errors) or (
+                        isinstance(e, self._httpx_read_errors) and method.upper() in retry_allowed_methods
+                    )
+                    if not retryable or attempt >= retry_total:
+                        raise
+                    attempt += 1
+                    await self.__before_retry(method, url, sdk_method, breaker, attempt, error=e)
+                    continue
+                elapsed = time.monotonic() - start
+                if self.metrics:
+                    size = 0 if stream else len(response.content)  # streamed bytes are recorded as read
+                    self.metrics.record_request(method, url, response.status_code, elapsed, size)
+                if hooks:
+                    self.__after_response(sdk_method, method, url, response, elapsed, None)
+                if limiter and response.status_code < 400:
+                    limiter.succeeded()
+                retryable = response.status_code in retry_status_forcelist and method.upper() in retry_allowed_methods
+                if not retryable or attempt >= retry_total:
+                    self.__invalidate_responses(method, url)
+                    outcome = response.status_code not in failure_status_codes
+                    return response
+                if stream:
+                    await response.aclose()  # the body of a response which will be retried is never read
+                attempt += 1
+                await self.__before_retry(method, url, sdk_method, breaker, attempt, response=response)
+        finally:
+            if breaker:  # also releases a half open probe when cancelled or failing before a request is sent
+                breaker.record(outcome)
+
+    async def __before_retry(self, method, url, sdk_method, breaker, attempt, response=None, error=None):
+        # count the failed attempt and wait out the backoff (or Retry-After) before the next attempt
+        if breaker and (response is None or response.status_code in failure_status_codes):
+            breaker.failed()  # stop retrying as soon as the circuit opens
+        if self.metrics:
+            self.metrics.record_retry(method, url)
+        if self.hooks.active:
+            self.hooks.emit('on_retry', {
+                'sdk_method': sdk_method,
+                'method': method,
+                'url': url,
+                'status_code': response.status_code if response is not None else None,
+                'error': error,
+                'attempt': attempt
+            })
+        backoff = min(retry_backoff_max, retry_backoff_factor * (2 ** (attempt - 1)))
+        retry_after = response.headers.get('retry-after', '') if response is not None else ''
+        if retry_after.isdigit():
+            backoff = int(retry_after)
+        limiter = self._sync.rate_limiter
+        if limiter and response is not None and response.status_code == 429:
+            limiter.throttled(int(retry_after) if retry_after.isdigit() else None)
+            if retry_after.isdigit():
+                # the limiter holds every request of the tenant for the Retry-After period (waited for before the next
+                # attempt) instead of each request backing off on its own
+                backoff = 0
+        exceeded = deadlines.exceeded(backoff)  # fail now rather than retry after the deadline of the call
+        if exceeded:
+            raise exceeded
+        if backoff:
+            await asyncio.sleep(backoff)
+
+    async def __stream_request(self, method, url, **kwargs):
+        # same as `httpx.AsyncClient.request` but the body is left unread - the caller must close the response
+        timeout = kwargs.pop('timeout')
+        return await self.client.send(self.client.build_request(method, url, timeout=timeout, **kwargs), stream=True)
+
+    def __invalidate_responses(self, method, url):
+        # drop cached responses a mutating request may have changed (even if it failed as it may have been applied)
+        cache = self._sync.response_cache
+        if cache and method != 'get':
+            cache.invalidate(endpoint_family(url))
+
+    async def __hedged_request(self, hedging, endpoint, request):
+        delay = hedging.delay(endpoint)
+        start = time.monotonic()
+        if delay is None:  # not enough latencies recorded for the endpoint yet
+            response = await request()
+            hedging.record(endpoint, time.monotonic() - start)
+            return response
+        first = asyncio.ensure_future(request())
+        tasks = [first]
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done and hedging.allow():
+            limiter = self._sync.rate_limiter
+            if limiter:
+                wait = limiter.reserve()
+                if wait:
+                    await asyncio.sleep(wait)
+            tasks.append(asyncio.ensure_future(request()))
+
+        pending = set(tasks)
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # use the first response, or the last error if every request failed
+                task = next((t for t in done if t.exception() is None), next(iter(done)))
+                if task.exception() is None or not pending:
+                    break
+        finally:
+            for other in pending:  # also cancels every request if the call itself is cancelled
+                other.cancel()
+        # the latency of the first request is recorded up to when it completed or was cancelled
+        hedging.record(endpoint, time.monotonic() - start)
+        if task is not first:
+            hedging.hedge_won()
+        return task.result()
+
+    def __after_response(self, sdk_method, method, url, response, elapsed, error):
+        self.hooks.emit('after_response', {
+            'sdk_method': sdk_method,
+            'method': method,
+            'url': url,
+            'status_code': response.status_code if response is not None else None,
+            'elapsed': elapsed,
+            'response': response,
+            'error': error
+        })
+
+    def __on_page(self, method, url, page, records, call_start):
+        self.hooks.emit('on_page', {
+            'sdk_method': _sdk_method.get(),
+            'method': method,
+            'url': url,
+            'page': page,
+            'records': len(records),
+            'elapsed': time.monotonic() - call_start
+        })
+
+    async def __pages(self, method, url, params=None, data=None, json=None):
+        # async generator which yields a tuple of (pagination_type, result) for each page of results - see
+        # `Britive.__pages` for details
+        pagination_type = None
+        adaptive = isinstance(self.page_size, AdaptivePageSize) and method == 'get' and \
+            AdaptivePageSize.applies_to(params)
+        hooks = self.hooks.active
+        call_url = url
+        call_start = time.monotonic()
+        page = 0
+        while True:  # infinite loop in case of pagination - we will break the loop when needed
+            start = time.monotonic()
+            try:
+                response = await self.__send(method, url, params=params, data=data, json=json)
+                responses.check_response_for_error(response)  # handle an error response
+            except self._adaptive_page_size_errors:
+                # retry the same records with a smaller page size if the page size is being adapted
+                retry_params = self.page_size.retry_params(params) if adaptive else None
+                if not retry_params:
+                    raise
+                params = retry_params
+                continue
+
+            if responses.response_has_no_content(response):  # handle no content responses
+                yield 'none', None
+                return
+
+            # handle secrets file download
+            download = responses.file_download(response, url)
+            if download:
+                yield 'none', download
+                return
+
+            # load the result as a dict
+            try:
+                result = response.json()
+            except ValueError:
+                yield 'none', response.content.decode('utf-8')
+                return
+            latency = time.monotonic() - start
+
+            # only determine the pagination type from the first page - see `Britive.__pages` for details
+            if pagination_type is None:
+                pagination_type = responses.pagination_type(response.headers, result)
+
+            if pagination_type == 'none':  # we are not dealing with pagination so just return the response as-is
+                yield 'none', result
+                return
+
+            records, url, params = responses.next_page(pagination_type, response.headers, result, url, params)
+            page += 1
+            if hooks:
+                self.__on_page(method, call_url, page, records, call_start)
+            yield pagination_type, records
+            if not url:  # no more pages so time to break the loop
+                return
+
+            # inline pagination tells us how many pages remain after the first page so fetch them concurrently
+            if pagination_type == 'inline' and method == 'get' and self.pagination_concurrency > 1:
+                async for records in self.__concurrent_inline_pages(url, params, result):
+                    page += 1
+                    if hooks:
+                        self.__on_page(method, call_url, page, records, call_start)
+                    yield 'inline', records
+                return
+
+            if adaptive and pagination_type == 'inline':
+                params = self.page_size.next_params(params, latency)
+
+    async def __concurrent_inline_pages(self, url, params, first_page):
+        # keep at most `pagination_concurrency` pages in flight and yield the records of each page in order
+        last_page = math.ceil(first_page['count'] / first_page['size'])
+        in_flight = deque()
+        try:
+            for page in range(params['page'], last_page):
+                in_flight.append(asyncio.ensure_future(self.__inline_page(url, {**params, 'page': page})))
+                if len(in_flight) >= self.pagination_concurrency:
+                    yield await in_flight.popleft()
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def __inline_page(self, url, params):
+        response = await self.__send('get', url, params=params)
+        responses.check_response_for_error(response)
+        return response.json()['data']
+
+    async def __request(self, method, url, params=None, data=None, json=None):
+        return_data = []
+        pages = 0
+        try:
+            async for pagination_type, result in self.__pages(method, url, params=params, data=data, json=json):
+                pages += 1
+                if pagination_type == 'none':
+                    return result
+                return_data += result
+            return return_data
+        finally:
+            if self.metrics and pages:
+                self.metrics.record_call(method, url, pages)
@@ -1,10 +1,19 @@
+import csv as csv_lib
 import datetime
+import json
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .helpers import columnar
+from .helpers.cursor_stores import CursorStore, MemoryCursorStore
 
 
 class AuditLogs:
     def __init__(self, britive):
         self.britive = britive
         self.base_url = f'{self.britive.base_url}/logs'
+        self.cursor_store = MemoryCursorStore()
 
     def fields(self) -> dict:
         """
@@ -25,7 +34,7 @@ class AuditLogs:
         return self.britive.get(f'{self.base_url}/operators')
 
     def query(self, from_time: datetime = None, to_time: datetime = None, filter_expression: str = None,
-              csv: bool = False) -> any:
+              csv: bool = False, stream: bool = False, page_size: int = None, output_format: str = 'records') -> any:
         """
         Retrieve audit log events.
 
@@ -34,6 +43,18 @@ class AuditLogs:
             - True: A CSV string is returned. The caller must persist the CSV string to disk.
             - False: A python list of audit events is returned.
 
+        `stream` is only applicable when `csv = False`. If True a generator is returned which yields audit events as
+        each page of results is retrieved so memory usage remains flat regardless of the size of the time frame.
+
+        `output_format` options (only applicable when `csv = False`; `stream = True` requires `records`):
+
+            - records: A python list of audit events.
+            - columns: A dict of column name to list of values. Nested fields are flattened into dot separated column
+                names (`actor.displayName`). Events are added to the columns page by page so a dict per event is
+                never retained.
+            - arrow: As `columns` but returned as a `pyarrow.Table`. Requires the `pyarrow` package.
+            - numpy: As `columns` but each list is a `numpy.ndarray`. Requires the `numpy` package.
+
         :param from_time: Lower end of the time frame to search. If not provided will default to
             7 days before `to_time`. `from_time` will be interpreted as if in UTC timezone so it is up to the caller to
             ensure that the datetime object represents UTC. Not timezone manipulation will occur.
@@ -45,10 +66,22 @@ class AuditLogs:
             Multiple filter expressions must be joined together by `and`. No other join operator is support.
             Example: actor.displayName co "bob" and event.displayName eq "application"
         :param csv: Will result in a CSV string of the audit events being returned instead of a python list of events.
-        :return: Either python list of events (dicts) or CSV string.
-        :raises: ValueError - If from_time is greater than to_time.
+        :param stream: Will result in a generator of audit events being returned instead of a python list of events.
+            Defaults to False.
+        :param page_size: The number of events to request per page. Only applicable when `csv = False`. Defaults to
+            the page size configured on the client, or 200 if none is configured.
+        :param output_format: The format of the events returned. Defaults to `records`.
+        :return: Either python list of events (dicts), generator of events (dicts), column oriented events or CSV
+            string.
+        :raises: ValueError - If from_time is greater than to_time, `output_format` is invalid, or `stream=True` with
+            an `output_format` other than `records`.
         """
 
+        if output_format not in columnar.output_formats:
+            raise ValueError(f'invalid output_format {output_format}')
+        if stream and not csv and output_format != 'records':
+            raise ValueError(f'stream is not supported with output_format {output_format}')
+
         to_time = to_time or datetime.datetime.utcnow()
         from_time = from_time or to_time - datetime.timedelta(days=7)
 
@@ -62,6 +95,249 @@ class AuditLogs:
         if filter_expression:
             params['filter'] = filter_expression
         if not csv:
-            params['size'] = 200
+            params['size'] = self.britive.resolve_page_size(page_size, default=200)
 
+        if stream and not csv:
+            return self.britive.iter_get(self.base_url, params=params)
+        if output_format != 'records' and not csv:
+            builder = columnar.ColumnBuilder()
+            for event in self.britive.iter_get(self.base_url, params=params):
+                builder.append(_flatten(event))
+            return columnar.convert(builder.columns, output_format)
         return self.britive.get(f'{self.base_url}{"/csv" if csv else ""}', params=params)
+
+    def export(self, from_time: datetime = None, to_time: datetime = None, filter_expression: str = None,
+               window: datetime.timedelta = datetime.timedelta(hours=6), max_workers: int = 4, file: any = None,
+               file_format: str = 'jsonl') -> any:
+        """
+        Export audit log events for a (potentially large) time frame.
+
+        The time frame is split into consecutive windows of `window` in length. The windows are queried in parallel
+        (at most `max_workers` at once) and the events are merged back into time order (oldest event first). Events
+        which appear on both sides of a window boundary are only returned once.
+
+        At most `max_workers` windows of events are held in memory at any one time.
+
+        If `file` is provided the events are written to the file as they are retrieved, otherwise a generator of
+        events is returned.
+
+        `file_format` options:
+
+            - jsonl: One JSON document per line, per event.
+            - csv: Nested fields are flattened into dot separated column names (`actor.displayName`). The columns
+                are the fields of every event of the first window which returns events. Fields which only appear in
+                later events are written, as a JSON object, to a final `_extra` column.
+            - parquet, feather: Nested fields are flattened as with `csv`. The events are gathered into columns and
+                written once all windows have been retrieved. Requires the `pyarrow` package.
+
+        :param from_time: Lower end of the time frame to export. If not provided will default to 7 days before
+            `to_time`. Interpreted as if in UTC timezone.
+        :param to_time: Upper end of the time frame to export. If not provided will default to
+            `datetime.datetime.utcnow()`. Interpreted as if in UTC timezone.
+        :param filter_expression: The expression used to filter the results. See `query` for details.
+        :param window: The length of time covered by each parallel query. Must be positive. Defaults to 6 hours.
+        :param max_workers: The maximum number of windows to query at once. Defaults to 4.
+        :param file: Optional path to a file, or file-like object opened for writing text (bytes for `parquet` and
+            `feather`), to which the events will be written.
+        :param file_format: The format of the file. Valid values are `jsonl`, `csv`, `parquet` and `feather`. Defaults
+            to `jsonl`.
+        :return: If `file` is provided the number of events written, else a generator of events (dicts).
+        :raises: ValueError - If from_time is greater than to_time, `window` is not positive or `file_format` is
+            invalid.
+        """
+
+        to_time = to_time or datetime.datetime.utcnow()
+        from_time = from_time or to_time - datetime.timedelta(days=7)
+
+        if from_time > to_time:
+            raise ValueError('from_time must occur before to_time.')
+        if window <= datetime.timedelta(0):
+            raise ValueError('window must be positive.')
+        if file_format not in ['jsonl', 'csv'] + columnar.file_formats:
+            raise ValueError(f'invalid file_format {file_format}')
+
+        windows = self._export_deduplicated_windows(from_time, to_time, filter_expression, window, max_workers)
+        events = (event for events in windows for event in events)
+        if file is None:
+            return events
+        if file_format == 'csv':
+            if isinstance(file, str):
+                with open(file, 'w', newline='') as f:
+                    return self._write_csv(windows, f)
+            return self._write_csv(windows, file)
+        if file_format in columnar.file_formats:
+            builder = columnar.ColumnBuilder()
+            for event in events:
+                builder.append(_flatten(event))
+            columnar.write(builder.columns, file, file_format=file_format)
+            return builder.length
+        if isinstance(file, str):
+            with open(file, 'w', newline='') as f:
+                return self._write_events(events, f)
+        return self._write_events(events, file)
+
+    def _query_sorted(self, from_time: datetime, to_time: datetime, filter_expression: str) -> list:
+        events = self.query(from_time=from_time, to_time=to_time, filter_expression=filter_expression)
+        return sorted(events, key=lambda e: e.get('timestamp') or '')
+
+    def _export_deduplicated_windows(self, from_time: datetime, to_time: datetime, filter_expression: str,
+                                     window: datetime.timedelta, max_workers: int):
+        windows = []
+        start = from_time
+        while start < to_time:
+            end = min(start + window, to_time)
+            windows.append((start, end))
+            start = end
+
+        # the API works at a resolution of seconds so events at a window boundary can be returned by both
+        # windows - only yield those events once
+        previous_keys = set()
+        for events in self._export_windows(windows, filter_expression, max_workers):
+            keys = [_event_key(event) for event in events]
+            yield [event for key, event in zip(keys, events) if key not in previous_keys]
+            previous_keys = set(keys)
+
+    def _export_windows(self, windows: list, filter_expression: str, max_workers: int):
+        # keep at most `max_workers` windows in flight and yield the events of each window in order - each window runs
+        # in a copy of the current context so the deadline of the call (if any) applies to it
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            for window_from, window_to in windows:
+                in_flight.append(executor.submit(
+                    contextvars.copy_context().run, self._query_sorted, window_from, window_to, filter_expression
+                ))
+                if len(in_flight) >= max_workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def tail(self, cursor_store: CursorStore = None, cursor_name: str = 'default', filter_expression: str = None,
+             from_time: datetime = None, overlap: datetime.timedelta = datetime.timedelta(0)) -> list:
+        """
+        Retrieve the audit log events which have occurred since the last call to `tail` with the same cursor.
+
+        The timestamp of the newest event returned, along with the events which share that timestamp, is saved in a
+        cursor so each call only queries from where the previous call left off and never returns an event twice.
+
+        The cursor is saved in `cursor_store`, which by default holds cursors in memory for the life of this client.
+        To resume across processes provide a persistent store from `britive.helpers.cursor_stores`
+        (`FileCursorStore`, `SqliteCursorStore`) or any object implementing `CursorStore`.
+
+        Events are sometimes recorded with a timestamp slightly in the past. Providing an `overlap` re-queries that
+        amount of time before the cursor on each call so those events are returned too. Events already returned are
+        still not returned again.
+
+        :param cursor_store: Where to load and save the cursor. Defaults to an in-memory store.
+        :param cursor_name: The name of the cursor. Use different names for independent readers (for example one per
+            filter expression). Defaults to `default`.
+        :param filter_expression: The expression used to filter the results. See `query` for details.
+        :param from_time: Where to start when no cursor exists yet. If not provided will default to 7 days ago.
+            Interpreted as if in UTC timezone.
+        :param overlap: How far before the cursor to re-query for late arriving events. Defaults to no overlap.
+        :return: List of new events (dicts), oldest event first.
+        """
+
+        cursor_store = cursor_store or self.cursor_store
+        key = f'{self.britive.tenant}|{cursor_name}'
+        cursor = cursor_store.get(key)
+        to_time = datetime.datetime.utcnow()
+
+        seen = set()
+        if cursor:
+            from_time = _parse_timestamp(cursor['timestamp']) - overlap
+            seen = set(cursor['keys'])
+        else:
+            from_time = from_time or to_time - datetime.timedelta(days=7)
+        from_time = from_time.replace(microsecond=0)  # the API works at a resolution of seconds
+
+        events = self._query_sorted(from_time, to_time, filter_expression)
+        new_events = [e for e in events if _event_key(e) not in seen]
+
+        if events:
+            # every event at or after the new cursor position (minus the overlap) is re-queried on the next call so
+            # remember them to avoid returning them again
+            timestamp = events[-1]['timestamp']
+            if cursor and _parse_timestamp(cursor['timestamp']) > _parse_timestamp(timestamp):
+                timestamp = cursor['timestamp']
+            boundary = (_parse_timestamp(timestamp) - overlap).replace(microsecond=0)
+            keys = [_event_key(e) for e in events if _parse_timestamp(e['timestamp']) >= boundary]
+            cursor_store.set(key, {'timestamp': timestamp, 'keys': keys})
+        elif not cursor:  # nothing found yet so start from here next time
+            cursor_store.set(key, {'timestamp': to_time.isoformat(sep='T', timespec='seconds') + 'Z', 'keys': []})
+
+        return new_events
+
+    def follow(self, interval: int = 60, cursor_store: CursorStore = None, cursor_name: str = 'default',
+               filter_expression: str = None, from_time: datetime = None,
+               overlap: datetime.timedelta = datetime.timedelta(0)):
+        """
+        Continuously yield new audit log events, calling `tail` every `interval` seconds.
+
+        This generator never ends on its own. Arguments other than `interval` are passed to `tail`.
+
+        :param interval: The number of seconds to wait between polls. Defaults to 60 seconds.
+        :return: Generator of events (dicts).
+        """
+
+        while True:
+            yield from self.tail(
+                cursor_store=cursor_store,
+                cursor_name=cursor_name,
+                filter_expression=filter_expression,
+                from_time=from_time,
+                overlap=overlap
+            )
+            time.sleep(interval)
+
+    @staticmethod
+    def _write_events(events, file) -> int:
+        count = 0
+        for event in events:
+            file.write(json.dumps(event, default=str) + '\n')
+            count += 1
+        return count
+
+    @staticmethod
+    def _write_csv(windows, file) -> int:
+        count = 0
+        writer = None
+        columns = None
+        for events in windows:
+            rows = [_flatten(event) for event in events]
+            if writer is None and rows:
+                # the columns are the fields of every event of the first window (in the order they first appear)
+                columns = list(dict.fromkeys(column for row in rows for column in row))
+                writer = csv_lib.DictWriter(file, fieldnames=columns + ['_extra'])
+                writer.writeheader()
+                columns = set(columns)
+            for row in rows:
+                extra = {column: row.pop(column) for column in list(row) if column not in columns}
+                if extra:  # fields not seen in the first window are kept rather than dropped
+                    row['_extra'] = json.dumps(extra, default=str)
+                writer.writerow(row)
+                count += 1
+        return count
+
+
+def _event_key(event: dict) -> str:
+    return event.get('id') or json.dumps(event, sort_keys=True, default=str)
+
+
+def _parse_timestamp(timestamp: str) -> datetime.datetime:
+    # audit event timestamps are in UTC with an optional fractional second - 2023-03-27T18:49:53.123Z
+    timestamp = timestamp.rstrip('Z')
+    seconds, _, fraction = timestamp.partition('.')
+    parsed = datetime.datetime.strptime(seconds, '%Y-%m-%dT%H:%M:%S')
+    return parsed.replace(microsecond=int(fraction[:6].ljust(6, '0'))) if fraction else parsed
+
+
+def _flatten(event: dict, prefix: str = '') -> dict:
+    flat = {}
+    for key, value in event.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix=f'{prefix}{key}.'))
+        elif isinstance(value, list):
+            flat[f'{prefix}{key}'] = json.dumps(value, default=str)
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
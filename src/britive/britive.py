@@ -1,45 +1,148 @@
+import codecs
+import contextvars
+import functools
+import importlib
+import math
 import os
 import requests
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from requests.adapters import HTTPAdapter, Retry
+from urllib3.exceptions import ReadTimeoutError
 import json as native_json
-import pkg_resources
 import socket
+import sys
+import threading
+import time
+from typing import Union
 from .helpers import methods as helper_methods
 from .helpers import federation_providers as fp
-from .users import Users
-from .service_identity_tokens import ServiceIdentityTokens
-from .service_identities import ServiceIdentities
+from .helpers import responses
+from .helpers import deadline as deadlines
+from .helpers.circuit_breaker import CircuitBreakers, endpoint_family, failure_status_codes
+from .helpers.feature_caches import FeatureCache
+from .helpers.hedging import HedgingPolicy
+from .helpers.hooks import Hooks
+from .helpers.metrics import Metrics
+from .helpers.page_size import AdaptivePageSize
+from .helpers.polling import ExponentialBackoff, PollingStrategy
+from .helpers.rate_limit import RateLimiter
+from .helpers.response_cache import ResponseCache
+from .helpers.tenant_cache import tenants
 from .exceptions import *
-from .tags import Tags
-from .applications import Applications
-from .environments import Environments
-from .environment_groups import EnvironmentGroups
-from .scans import Scans
-from .accounts import Accounts
-from .permissions import Permissions
-from .groups import Groups
-from .identity_attributes import IdentityAttributes
-from .profiles import Profiles
-from .task_services import TaskServices
-from .tasks import Tasks
-from .security_policies import SecurityPolicies
-from .saml import Saml
-from .api_tokens import ApiTokens
-from .audit_logs import AuditLogs
-from .reports import Reports
-from .identity_providers import IdentityProviders
-from .my_access import MyAccess
-from .notifications import Notifications
-from .my_secrets import MySecrets
-from .policies import Policies
-from .secrets_manager import SecretsManager
-from .notification_mediums import NotificationMediums
-from .workload import Workload
-from .system.system import System
 
 BRITIVE_TENANT_ENV_NAME = 'BRITIVE_TENANT'
 BRITIVE_TOKEN_ENV_NAME = 'BRITIVE_API_TOKEN'
 
+# the resources of the client as attribute name: (module, class) - each is only imported and constructed the first time
+# it is accessed so constructing a client (for example in a short-lived CLI or Lambda invocation) stays fast
+resources = {
+    'users': ('.users', 'Users'),
+    'service_identity_tokens': ('.service_identity_tokens', 'ServiceIdentityTokens'),
+    'service_identities': ('.service_identities', 'ServiceIdentities'),
+    'tags': ('.tags', 'Tags'),
+    'applications': ('.applications', 'Applications'),
+    'environments': ('.environments', 'Environments'),
+    'environment_groups': ('.environment_groups', 'EnvironmentGroups'),
+    'scans': ('.scans', 'Scans'),
+    'accounts': ('.accounts', 'Accounts'),
+    'permissions': ('.permissions', 'Permissions'),
+    'groups': ('.groups', 'Groups'),
+    'identity_attributes': ('.identity_attributes', 'IdentityAttributes'),
+    'profiles': ('.profiles', 'Profiles'),
+    'task_services': ('.task_services', 'TaskServices'),
+    'tasks': ('.tasks', 'Tasks'),
+    'security_policies': ('.security_policies', 'SecurityPolicies'),
+    'saml': ('.saml', 'Saml'),
+    'api_tokens': ('.api_tokens', 'ApiTokens'),
+    'audit_logs': ('.audit_logs', 'AuditLogs'),
+    'reports': ('.reports', 'Reports'),
+    'identity_providers': ('.identity_providers', 'IdentityProviders'),
+    'my_access': ('.my_access', 'MyAccess'),
+    'notifications': ('.notifications', 'Notifications'),
+    'my_secrets': ('.my_secrets', 'MySecrets'),
+    'policies': ('.policies', 'Policies'),
+    'secrets_manager': ('.secrets_manager', 'SecretsManager'),
+    'notification_mediums': ('.notification_mediums', 'NotificationMediums'),
+    'workload': ('.workload', 'Workload'),
+    'system': ('.system.system', 'System')
+}
+
+# errors which indicate a page of results may be too large for the backend to return in time
+adaptive_page_size_errors = (
+    requests.exceptions.RetryError,
+    requests.exceptions.Timeout,
+    InternalServerError,
+    ServiceUnavailable
+)
+
+
+def _page_may_be_too_large(error: Exception) -> bool:
+    # the retries of the session wrap an exhausted read timeout in a ConnectionError (of a MaxRetryError) rather than
+    # a Timeout, so a ConnectionError only counts when its reason is a read timeout
+    if not isinstance(error, requests.exceptions.ConnectionError) or isinstance(error, adaptive_page_size_errors):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, ReadTimeoutError)
+
+
+@functools.lru_cache(maxsize=None)
+def _version() -> str:
+    # importlib.metadata is far cheaper to import than pkg_resources but is only available in python 3.8+
+    try:
+        try:
+            from importlib.metadata import version
+        except ImportError:
+            import pkg_resources
+            return pkg_resources.get_distribution('britive').version
+        return version('britive')
+    except Exception:
+        return 'unknown'
+
+
+class _Retry(Retry):
+    """
+    `urllib3` `Retry` which reports each retry to `on_retry` so automatic retries are not silent, and paces retries
+    with the rate limiter returned by `rate_limiter`, if any.
+    """
+
+    on_retry = None
+    rate_limiter = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.on_retry = self.on_retry
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def sleep(self, response=None):
+        # fail now rather than sleep when the retry would not happen before the deadline of the call
+        retry_after = self.get_retry_after(response) if response is not None else None
+        wait = retry_after or self.get_backoff_time()
+        exceeded = deadlines.exceeded(wait)
+        if exceeded:
+            raise exceeded
+        limiter = self.rate_limiter() if self.rate_limiter else None
+        if limiter and retry_after is not None and response.status == 429:
+            limiter.acquire()  # the limiter already holds every request of the tenant for the Retry-After period
+            return
+        super().sleep(response)
+        if limiter:
+            limiter.acquire()
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # raises MaxRetryError if retries are exhausted so `on_retry` is only called when a retry will occur
+        retry = super().increment(method, url, response=response, error=error, _pool=_pool, _stacktrace=_stacktrace)
+        if self.on_retry:
+            self.on_retry(method, url, response, error, retry)
+        return retry
+
+
+def _discard_response(future) -> None:
+    # release the connection of a hedged request which lost
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
 
 class Britive:
     """
@@ -72,12 +175,25 @@ class Britive:
     In order to obtain the tenant name, reference the Britive URL used to login to the UI. If the URL is
     https://example.britive-app.com then the tenant name will be `example`.
 
-    No assumptions are made about the operating system or file system. Nothing is persisted to disk. The end user
-    must persist responses to disk if and when that is required.
+    No assumptions are made about the operating system or file system. Nothing is persisted to disk unless a cache or
+    store which persists to disk is explicitly configured (`FileResponseCache`, `FileFeatureCache`, `FileCursorStore`,
+    `SqliteCursorStore` or the tenant cache via environment variable `BRITIVE_TENANT_CACHE_PATH`). The end user must
+    otherwise persist responses to disk if and when that is required.
+
+    A single instance is thread safe and can be shared by any number of threads. Pagination state is kept per call
+    (the parameters provided to a method are never modified) and the connection pool can be sized for the number of
+    threads via `pool_maxsize`.
     """
 
     def __init__(self, tenant: str = None, token: str = None, query_features: bool = True,
-                 token_federation_provider: str = None, token_federation_provider_duration_seconds: int = 900):
+                 token_federation_provider: str = None, token_federation_provider_duration_seconds: int = 900,
+                 pagination_concurrency: int = 1, page_size: Union[int, str, AdaptivePageSize] = None,
+                 polling: PollingStrategy = None, metrics: Metrics = None, hooks: Hooks = None,
+                 feature_cache: FeatureCache = None, validate_tenant: bool = True,
+                 rate_limit: Union[float, RateLimiter] = None, timeout: Union[float, tuple] = None,
+                 hedging: HedgingPolicy = None, circuit_breakers: CircuitBreakers = None, pool_connections: int = 10,
+                 pool_maxsize: int = None, pool_block: bool = False, keep_alive: bool = True,
+                 response_cache: ResponseCache = None):
         """
         Instantiate an authenticated interface that can be used to communicate with the Britive API.
 
@@ -89,18 +205,94 @@ class Britive:
             vs v2, secrets manager enabled,etc.). True by default but can be disabled as needed if the end user does not
             want to wait for that API call. Querying for features will help instruct the SDK as to what API calls are
             allowed to be used based on the features enabled, vs. attempting to make the API call and getting an error.
+            Features are queried the first time they are needed (attribute `feature_flags` or `profiles`) rather than
+            during construction.
         :param token_federation_provider: The federation provider to use to source the token. Details of what can be
             provided can be found in the documentation for the Britive.source_federation_token_from method.
         :param token_federation_provider_duration_seconds: Only applicable for the AWS provider. Specify the number of
             seconds for which the generated token is valid. Defaults to 900 seconds (15 minutes).
+        :param pagination_concurrency: The maximum number of pages to retrieve concurrently for list endpoints which
+            report the total number of records with the first page. Once the first page is returned the remaining
+            pages are requested over a bounded pool of this many workers and returned in order. Defaults to 1 which
+            retrieves pages sequentially. Can also be changed after construction via attribute
+            `pagination_concurrency`.
+        :param page_size: The number of records to request per page for list endpoints. If not provided each method
+            uses its own default (generally 100). Individual methods which accept a `page_size` parameter can override
+            this value per call. Provide `adaptive` (or an instance of
+            `britive.helpers.page_size.AdaptivePageSize` for finer control) to have the page size grow while pages
+            are returned quickly and shrink on slow pages, 5xx errors and timeouts.
+        :param polling: The strategy used to wait between status checks while polling for a checkout, credentials,
+            an approval, etc. Defaults to `britive.helpers.polling.ExponentialBackoff()` which starts at 50ms and
+            backs off, with jitter, to a maximum of 30 seconds (or the `wait_time` of the method, if lower). Provide
+            any `britive.helpers.polling.PollingStrategy`, for example `FixedInterval(1)`, to change this behavior.
+            Can also be changed after construction via attribute `polling`.
+        :param metrics: Where to record per endpoint request statistics (counts, latency, retries, status codes, bytes
+            and pages per call). Defaults to a new `britive.helpers.metrics.Metrics` instance. Provide an instance to
+            share statistics between clients. Available via attribute `metrics`; set it to None to stop recording.
+        :param hooks: Callbacks invoked before each request, after each response, on each automatic retry and for
+            each page of paginated results, for tracing, logging, etc. Defaults to a new
+            `britive.helpers.hooks.Hooks` instance to which callbacks can be registered via attribute `hooks`. See
+            `britive.helpers.hooks.Hooks` for the details provided to each callback.
+        :param feature_cache: Where to cache the features of the tenant so they are not queried by every new client.
+            Provide a `britive.helpers.feature_caches.MemoryFeatureCache` shared by the clients of a process, a
+            `FileFeatureCache` shared by every process on the host, or any other
+            `britive.helpers.feature_caches.FeatureCache`. Defaults to None (not cached).
+        :param validate_tenant: Whether to validate the tenant via DNS. Resolved tenants are cached process-wide (see
+            `britive.helpers.tenant_cache`) so the lookups are only made once per tenant. If False a fully qualified
+            tenant host (for example `example.britive-app.com`) is used as-is without any DNS lookup. Defaults to True.
+        :param rate_limit: The number of requests per second to allow. Requests (including automatic retries) wait for
+            a token from a `britive.helpers.rate_limit.RateLimiter` which is shared by every client of the tenant in
+            the process, lowers its rate on 429 responses (holding every request for the `Retry-After` period) and
+            raises it again as requests succeed. Provide a `RateLimiter` instance for finer control. Defaults to None
+            (no rate limit). Available via attribute `rate_limiter`.
+        :param timeout: The number of seconds to wait to establish a connection and for the server to send data, as a
+            single value for both or a tuple of (connect, read). Defaults to None (wait forever). The total time of a
+            call, including every page, retry and status check, can be limited with `deadline`. Can also be changed
+            after construction via attribute `timeout`.
+        :param hedging: A `britive.helpers.hedging.HedgingPolicy` which sends a second `GET` request to the endpoints
+            it enables when the first has not responded within a percentile of their recent latency, using whichever
+            responds first. Defaults to None (no hedging). Available via attribute `hedging`.
+        :param circuit_breakers: A `britive.helpers.circuit_breaker.CircuitBreakers` which fails requests to a backend
+            (endpoint family, for example `secretmanager` or `reports`) fast with `CircuitOpen` once it is failing,
+            rather than every caller spending its retries on it. Defaults to None. Available via attribute
+            `circuit_breakers`.
+        :param pool_connections: The number of hosts to keep a pool of connections for. Defaults to 10.
+        :param pool_maxsize: The maximum number of connections kept in the pool of each host, which should be at least
+            the number of threads sharing the client. Defaults to 10 or `pagination_concurrency`, whichever is larger.
+        :param pool_block: Whether a request waits for a connection to be returned to the pool when all `pool_maxsize`
+            connections are in use. Defaults to False, which opens an additional connection that is closed (rather than
+            pooled) once the request completes.
+        :param keep_alive: Whether connections are kept open and re-used for subsequent requests. Defaults to True.
+        :param response_cache: A `britive.helpers.response_cache.ResponseCache` (for example `MemoryResponseCache` or
+            `FileResponseCache`) which caches the responses of endpoints which rarely change (`applications.catalog()`,
+            `audit_logs.fields()`, etc.) for a configurable time per endpoint. Cached responses are invalidated when
+            the SDK modifies the same endpoint family. Defaults to None (no caching). Available via attribute
+            `response_cache`.
         :raises: TenantMissingError, TokenMissingError
         """
 
+        self.__resources_lock = threading.RLock()
         self.tenant = tenant or os.environ.get(BRITIVE_TENANT_ENV_NAME)
+        self.pagination_concurrency = pagination_concurrency
+        self.timeout = timeout
+        self.hedging = hedging
+        self.circuit_breakers = circuit_breakers
+        self.response_cache = response_cache
+        self.__hedging_executor = None
+        self.page_size = AdaptivePageSize() if page_size == 'adaptive' else page_size
+        self.polling = polling or ExponentialBackoff()
+        self.metrics = metrics or Metrics()
+        self.hooks = hooks or Hooks()
+        self.feature_cache = feature_cache
+        self.__query_features = query_features
+        self.__feature_flags = None
+        self.__local = threading.local()  # the SDK method of the request in flight on each thread, for `on_retry`
+        self.__resource_paths = {}
 
         if token_federation_provider:
             self.__token = self.source_federation_token_from(
                 provider=token_federation_provider,
+                tenant=self.tenant,
                 duration_seconds=token_federation_provider_duration_seconds
             )
         else:
@@ -119,12 +311,23 @@ class Britive:
             )
 
         # clean up and apply logic to the passed in tenant (for backwards compatibility with no domain being required)
-        self.tenant = self.parse_tenant(self.tenant)
+        self.tenant = self.parse_tenant(self.tenant, validate=validate_tenant)
+        if isinstance(rate_limit, RateLimiter) or rate_limit is None:
+            self.rate_limiter = rate_limit
+        else:
+            self.rate_limiter = RateLimiter.for_tenant(self.tenant, rate_limit)
 
         self.base_url = f'https://{self.tenant}/api'
         self.session = requests.Session()
-        retries = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        retries = _Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        retries.on_retry = self.__on_retry
+        retries.rate_limiter = lambda: self.rate_limiter
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or max(10, pagination_concurrency),
+            pool_block=pool_block,
+            max_retries=retries
+        ))
 
         # allow the disabling of TLS/SSL verification for testing in development (mostly local development)
         if os.getenv('BRITIVE_NO_VERIFY_SSL') and '.dev.' in self.tenant:
@@ -141,48 +344,53 @@ class Britive:
         if len(self.__token.split('::')) > 1:
             token_type = 'WorkloadToken'
 
-        try:
-            version = pkg_resources.get_distribution('britive').version
-        except Exception:
-            version = 'unknown'
-
         self.session.headers.update({
             'Authorization': f'{token_type} {self.__token}',
             'Content-Type': 'application/json',
-            'User-Agent': f'britive-python-sdk/{version} {requests.utils.default_user_agent()}'
+            'User-Agent': f'britive-python-sdk/{_version()} {requests.utils.default_user_agent()}'
         })
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def __getattr__(self, name):
+        # only called when the attribute is not found the normal way - construct resources on first access
+        if name not in resources:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        with self.__resources_lock:  # so concurrent first accesses share the same instance
+            if name not in self.__dict__:
+                module, class_name = resources[name]
+                resource_class = getattr(importlib.import_module(module, __package__), class_name)
+                if name == 'profiles':
+                    self.__dict__[name] = resource_class(self, 1 if self.feature_flags.get('profile-v1') else 2)
+                else:
+                    self.__dict__[name] = resource_class(self)
+            return self.__dict__[name]
+
+    @property
+    def feature_flags(self) -> dict:
+        # resolved the first time it is needed so constructing a client does not require a network call
+        if self.__feature_flags is None:
+            with self.__resources_lock:
+                if self.__feature_flags is None:
+                    self.__feature_flags = self.__load_features()
+        return self.__feature_flags
+
+    @feature_flags.setter
+    def feature_flags(self, feature_flags: dict):
+        self.__feature_flags = feature_flags
+
+    def __load_features(self) -> dict:
+        if not self.__query_features:
+            return {}
+        features = self.feature_cache.get(self.tenant) if self.feature_cache else None
+        if features is None:
+            features = self.features()
+            if self.feature_cache:
+                self.feature_cache.set(self.tenant, features)
+        return features
 
-        self.feature_flags = self.features() if query_features else {}
-
-        self.users = Users(self)
-        self.service_identity_tokens = ServiceIdentityTokens(self)
-        self.service_identities = ServiceIdentities(self)
-        self.tags = Tags(self)
-        self.applications = Applications(self)
-        self.environments = Environments(self)
-        self.environment_groups = EnvironmentGroups(self)
-        self.scans = Scans(self)
-        self.accounts = Accounts(self)
-        self.permissions = Permissions(self)
-        self.groups = Groups(self)
-        self.identity_attributes = IdentityAttributes(self)
-        self.profiles = Profiles(self, 1 if self.feature_flags.get('profile-v1') else 2)
-        self.task_services = TaskServices(self)
-        self.tasks = Tasks(self)
-        self.security_policies = SecurityPolicies(self)
-        self.saml = Saml(self)
-        self.api_tokens = ApiTokens(self)
-        self.audit_logs = AuditLogs(self)
-        self.reports = Reports(self)
-        self.identity_providers = IdentityProviders(self)
-        self.my_access = MyAccess(self)
-        self.notifications = Notifications(self)
-        self.my_secrets = MySecrets(self)
-        self.policies = Policies(self)
-        self.secrets_manager = SecretsManager(self)
-        self.notification_mediums = NotificationMediums(self)
-        self.workload = Workload(self)
-        self.system = System(self)
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(resources))
 
     @staticmethod
     def source_federation_token_from(provider: str, tenant: str = None, duration_seconds: int = 900) -> str:
@@ -274,9 +482,25 @@ class Britive:
         raise InvalidFederationProvider(f'federation provider {provider} not supported')
 
     @staticmethod
-    def parse_tenant(tenant: str) -> str:
+    def parse_tenant(tenant: str, validate: bool = True) -> str:
+        """
+        Return the host (including the port, if provided) of the tenant, validated via DNS.
+
+        Resolved tenants are cached process-wide in `britive.helpers.tenant_cache.tenants` so the DNS lookups are only
+        made the first time a tenant is seen.
+
+        :param tenant: The name of the tenant (`example`), its host (`example.britive-app.com`) or its URL.
+        :param validate: If False a fully qualified host is returned as-is without a DNS lookup. Defaults to True.
+        :return: The host of the tenant.
+        """
+
+        host = tenants.get(tenant)
+        if host:
+            return host
         domain = tenant.replace('https://', '').replace('http://', '')   # remove scheme
         domain = domain.split('/')[0]  # remove any paths as they will not be needed
+        if not validate and '.' in domain.split(':')[0]:
+            return domain
         try:
             domain_helper = domain.split(':')
             port = 443
@@ -284,14 +508,100 @@ class Britive:
                 port = domain_helper[1]
             domain_without_port = domain_helper[0]
             socket.getaddrinfo(host=domain_without_port, port=port)  # if success then a full domain was provided
-            return domain
         except socket.gaierror:  # assume just the tenant name was provided (originally the only supported method)
             domain = f'{tenant}.britive-app.com'
             try:
                 socket.getaddrinfo(host=domain, port=443)  # validate the hostname is real
-                return domain  # and if so set the tenant accordingly
             except socket.gaierror:
                 raise Exception(f'Invalid tenant provided: {tenant}. DNS resolution failed.')
+        tenants.set(tenant, domain)
+        return domain
+
+    @staticmethod
+    def deadline(seconds: float):
+        """
+        Limit the SDK calls made within the context to `seconds` in total, covering every page, automatic retry and
+        status check (polling for a checkout, approval, secret, etc.) of each call.
+
+        `with britive.deadline(30): britive.my_access.checkout(...)`
+
+        Requests are sent with their timeouts lowered to the time remaining, retries which would not happen in time are
+        not attempted and, once the budget runs out, `britive.exceptions.DeadlineExceeded` is raised. The deadline
+        applies to the thread (or asyncio task) which entered the context.
+
+        :param seconds: The time budget in seconds.
+        :return: Context manager.
+        """
+
+        return deadlines.deadline(seconds)
+
+    def request_timeout(self) -> any:
+        """
+        Internal use only.
+
+        Return the timeout for the next request - the configured `timeout` lowered to the time remaining before the
+        deadline of the current call, if any.
+        """
+
+        left = deadlines.remaining()
+        if left is None:
+            return self.timeout
+        if self.timeout is None:
+            return left
+        if isinstance(self.timeout, tuple):
+            return tuple(left if t is None else min(t, left) for t in self.timeout)
+        return min(self.timeout, left)
+
+    def resolve_page_size(self, page_size: int = None, default: int = 100) -> int:
+        """Internal use only."""
+
+        if page_size:
+            return page_size
+        if isinstance(self.page_size, AdaptivePageSize):
+            return self.page_size.size
+        return self.page_size or default
+
+    def resolve_sdk_method(self) -> any:
+        """
+        Internal use only.
+
+        Return the name of the resource method, for example `my_access.checkout`, which the current call originated
+        from by walking the call stack for the outermost method of a resource of this client.
+        """
+
+        name = None
+        public = False
+        frame = sys._getframe(1)
+        while frame is not None:
+            code = frame.f_code
+            # only look at the locals of methods as accessing `f_locals` of every frame is comparatively expensive
+            if code.co_argcount and code.co_varnames[0] == 'self':
+                resource = frame.f_locals.get('self')
+                if resource is not self and getattr(resource, 'britive', None) is self:
+                    path = self.__resource_path(resource)
+                    # prefer public methods so `users.list` is reported instead of a private helper it called
+                    if path and (not public or not code.co_name.startswith('_')):
+                        name = f'{path}.{code.co_name}'
+                        public = not code.co_name.startswith('_')
+            frame = frame.f_back
+        return name
+
+    def __resource_path(self, resource):
+        path = self.__resource_paths.get(id(resource))
+        if path is None:  # resources can be replaced (profiles v1 vs v2, etc.) so rebuild the mapping on a miss
+            paths = {}
+
+            def walk(obj, prefix, depth):
+                for name, value in vars(obj).items():
+                    if not name.startswith('_') and getattr(value, 'britive', None) is self and id(value) not in paths:
+                        paths[id(value)] = f'{prefix}{name}'
+                        if depth < 3:
+                            walk(value, f'{prefix}{name}.', depth + 1)
+
+            walk(self, '', 0)
+            self.__resource_paths = paths
+            path = paths.get(id(resource))
+        return path
 
     def features(self):
         features = {}
@@ -302,7 +612,77 @@ class Britive:
     def get(self, url, params=None):
         """Internal use only."""
 
-        return self.__request('get', url, params=params)
+        cache = self.response_cache
+        ttl = cache.ttl(url) if cache else None
+        if not ttl:
+            return self.__request('get', url, params=params)
+        key = self.response_cache_key(url, params)
+        result = cache.get(key)
+        if result is None:
+            result = self.__request('get', url, params=params)
+            if result is not None:
+                cache.set(key, result, ttl, endpoint_family(url))
+        return result
+
+    def response_cache_key(self, url, params=None) -> str:
+        """Internal use only."""
+
+        return self.response_cache.key(url, params, tenant=self.tenant, token=self.__token)
+
+    def iter_get(self, url, params=None):
+        """
+        Internal use only.
+
+        Same as `get` but returns a generator which yields individual records as each page of results is retrieved,
+        instead of holding every page in memory before returning. Responses which are not paginated are yielded as
+        a single item (or item by item if the response is a list).
+        """
+
+        # the SDK method is resolved now as the generator will be consumed after the resource method has returned
+        return self.__iter_get(url, params, self.resolve_sdk_method() if self.hooks.active else None)
+
+    def __iter_get(self, url, params, sdk_method):
+        pages = 0
+        try:
+            for pagination_type, result in self.__pages('get', url, params=params, sdk_method=sdk_method):
+                pages += 1
+                if pagination_type == 'none':
+                    if isinstance(result, list):
+                        yield from result
+                    elif result is not None:
+                        yield result
+                    return
+                yield from result
+        finally:
+            if self.metrics and pages:
+                self.metrics.record_call('get', url, pages)
+
+    def iter_text(self, url, params=None, chunk_size=65536):
+        """
+        Internal use only.
+
+        Streams the body of a GET request, yielding it as decoded (UTF-8) text chunks as the bytes arrive instead of
+        holding the entire response in memory.
+        """
+
+        return self.__iter_text(url, params, chunk_size, self.resolve_sdk_method() if self.hooks.active else None)
+
+    def __iter_text(self, url, params, chunk_size, sdk_method):
+        response = self.__send('get', url, sdk_method=sdk_method, params=params, stream=True)
+        try:
+            responses.check_response_for_error(response)
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if self.metrics:
+                    self.metrics.record_bytes('get', url, len(chunk))
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+        finally:
+            response.close()
 
     def post(self, url, params=None, data=None, json=None):
         """Internal use only."""
@@ -333,7 +713,7 @@ class Britive:
         files = {
             filename: (f'{filename}.xml', file_content_as_str, content_type)
         }
-        response = self.session.patch(url, files=files, headers={'Content-Type': None})
+        response = self.__send('patch', url, files=files, headers={'Content-Type': None})
         try:
             return response.json()
         except native_json.decoder.JSONDecodeError:  # if we cannot decode json then the response isn't json
@@ -342,122 +722,275 @@ class Britive:
     # note - this method is only used to upload a file when creating a secret
     def post_upload(self, url, params=None, files=None):
         """Internal use only."""
-        response = self.session.post(url, params=params, files=files, headers={'Content-Type': None})
+        response = self.__send('post', url, params=params, files=files, headers={'Content-Type': None})
         try:
             return response.json()
         except native_json.decoder.JSONDecodeError:  # if we cannot decode json then the response isn't json
             return response.content.decode('utf-8')
 
-    @staticmethod
-    def __check_response_for_error(response):
-        if response.status_code in allowed_exceptions.keys():
-            try:
-                content = native_json.loads(response.content.decode('utf-8'))
-                message = f"{response.status_code} - " \
-                          f"{content.get('errorCode') or 'E0000'} - " \
-                          f"{content.get('message') or 'no message available'}"
-                if content.get('details'):
-                    message += f" - {content.get('details')}"
-                raise allowed_exceptions[response.status_code](message)
-            except native_json.decoder.JSONDecodeError as e:
-                content = response.content.decode('utf-8')
-                message = f"{response.status_code} - {content}"
-                raise allowed_exceptions[response.status_code](message)
-
-    @staticmethod
-    def __response_has_no_content(response):
-        # handle 204 No Content response
-        if response.status_code == 204:
-            return True
-
-        # handle empty 200 response
-        if response.status_code == 200 and len(response.content) == 0:
-            return True
-
-        return False
+    def __send(self, method, url, sdk_method=None, **kwargs):
+        # every request goes through here so it can be measured and hooked
+        breaker = self.circuit_breakers.breaker(url) if self.circuit_breakers else None
+        if breaker:
+            breaker.allow()  # fail fast if the backend is known to be failing
+        hooks = self.hooks.active
+        try:
+            if hooks:
+                sdk_method = sdk_method or self.resolve_sdk_method()
+                self.__local.sdk_method = sdk_method
+                self.hooks.emit('before_request', {
+                    'sdk_method': sdk_method,
+                    'method': method,
+                    'url': url,
+                    'params': kwargs.get('params')
+                })
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            timeout = self.request_timeout()
+        except BaseException:
+            if breaker:  # nothing was sent so release the probe, if this was one, without counting a result
+                breaker.record(None)
+            raise
+        start = time.monotonic()
+        endpoint = self.hedging.enabled(method, url) if self.hedging and not kwargs.get('stream') else None
+        try:
+            if endpoint:
+                response = self.__hedged_request(endpoint, method, url, timeout, kwargs)
+            else:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except Exception as e:
+            if breaker:  # other errors (deadline exceeded, circuit opened during retries, etc.) are not counted
+                breaker.record(False if isinstance(e, requests.exceptions.RequestException) else None)
+            elapsed = time.monotonic() - start
+            if self.metrics:
+                self.metrics.record_request(method, url, 'error', elapsed)
+            if hooks:
+                self.__after_response(sdk_method, method, url, None, elapsed, e)
+            self.__invalidate_responses(method, url)
+            if isinstance(e, requests.exceptions.RequestException):  # retried timeouts surface as ConnectionError
+                try:
+                    deadlines.remaining()  # report a timeout caused by the deadline of the call as such
+                except DeadlineExceeded as exceeded:
+                    raise exceeded from e
+            raise
+        except BaseException:  # KeyboardInterrupt, etc.
+            if breaker:
+                breaker.record(None)
+            raise
+        if breaker:
+            breaker.record(response.status_code not in failure_status_codes)
+        elapsed = time.monotonic() - start
+        if self.metrics:
+            size = 0 if kwargs.get('stream') else len(response.content)  # streamed bytes are recorded as read
+            self.metrics.record_request(method, url, response.status_code, elapsed, size)
+        if hooks:
+            self.__after_response(sdk_method, method, url, response, elapsed, None)
+        self.__invalidate_responses(method, url)
+        if self.rate_limiter and response.status_code < 400:
+            self.rate_limiter.succeeded()
+        return response
+
+    def __invalidate_responses(self, method, url):
+        # drop cached responses a mutating request may have changed (even if it failed as it may have been applied)
+        if self.response_cache and method != 'get':
+            self.response_cache.invalidate(endpoint_family(url))
+
+    def __hedged_request(self, endpoint, method, url, timeout, kwargs):
+        delay = self.hedging.delay(endpoint)
+        start = time.monotonic()
+        if delay is None:  # not enough latencies recorded for the endpoint yet
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+            self.hedging.record(endpoint, time.monotonic() - start)
+            return response
+        if self.__hedging_executor is None:
+            with self.__resources_lock:
+                if self.__hedging_executor is None:
+                    # threads are only started as needed so a high maximum costs nothing until it is used
+                    self.__hedging_executor = ThreadPoolExecutor(max_workers=128, thread_name_prefix='britive-hedging')
+        executor = self.__hedging_executor
+
+        # each request runs in a copy of the current context so the deadline of the call applies to it
+        first = executor.submit(contextvars.copy_context().run, self.session.request, method, url, timeout=timeout,
+                                **kwargs)
+        # record the latency of the first request even if it loses so the percentile is not skewed by hedging
+        first.add_done_callback(lambda _: self.hedging.record(endpoint, time.monotonic() - start))
+        futures = [first]
+        if not wait(futures, timeout=delay).done and self.hedging.allow():
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            futures.append(executor.submit(contextvars.copy_context().run, self.session.request, method, url,
+                                           timeout=timeout, **kwargs))
+
+        pending = set(futures)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # use the first response, or the last error if every request failed
+            future = next((f for f in done if f.exception() is None), next(iter(done)))
+            if future.exception() is None or not pending:
+                break
+        for other in pending:
+            other.cancel()
+            other.add_done_callback(_discard_response)
+        if future is not first:
+            self.hedging.hedge_won()
+        return future.result()
+
+    def __after_response(self, sdk_method, method, url, response, elapsed, error):
+        self.hooks.emit('after_response', {
+            'sdk_method': sdk_method,
+            'method': method,
+            'url': url,
+            'status_code': response.status_code if response is not None else None,
+            'elapsed': elapsed,
+            'response': response,
+            'error': error
+        })
 
-    @staticmethod
-    def __pagination_type(headers, result):
-        is_dict = isinstance(result, dict)
-        has_next_page_header = 'next-page' in headers.keys()
-
-        if is_dict and all(x in result.keys() for x in ['count', 'page', 'size', 'data']):
-            return 'inline'
-        if is_dict and has_next_page_header and all(x in result.keys() for x in ['data', 'reportId']):  # reports
-            return 'report'
-        if has_next_page_header:  # this interesting way of paginating is how audit_logs.query() does it
-            return 'audit'
-        if is_dict and all(x in result.keys() for x in ['result', 'pagination']):
-            return 'secmgr'
-        return 'none'
+    def __on_retry(self, method, url, response, error, retry):
+        # called by urllib3 for each automatic retry - `url` is the path (and query string) of the request
+        if self.circuit_breakers and (response is None or response.status in failure_status_codes):
+            try:
+                self.circuit_breakers.breaker(url).failed()
+            except CircuitOpen:
+                if response is not None:
+                    response.drain_conn()  # release the connection as the response will not be read
+                raise
+        if self.metrics:
+            self.metrics.record_retry(method, url)
+        if self.rate_limiter and response is not None and response.status == 429:
+            self.rate_limiter.throttled(retry.get_retry_after(response))
+        if self.hooks.active:
+            self.hooks.emit('on_retry', {
+                'sdk_method': getattr(self.__local, 'sdk_method', None),
+                'method': method.lower(),
+                'url': f'https://{self.tenant}{url}',
+                'status_code': response.status if response is not None else None,
+                'error': error,
+                'attempt': len(retry.history)
+            })
+
+    def __on_page(self, sdk_method, method, url, page, records, call_start):
+        self.hooks.emit('on_page', {
+            'sdk_method': sdk_method,
+            'method': method,
+            'url': url,
+            'page': page,
+            'records': len(records),
+            'elapsed': time.monotonic() - call_start
+        })
 
-    def __request(self, method, url, params=None, data=None, json=None):
-        return_data = []
-        num_iterations = 1
+    def __pages(self, method, url, params=None, data=None, json=None, sdk_method=None):
+        # generator which yields a tuple of (pagination_type, result) for each page of results - when the response
+        # is not paginated a single tuple is yielded with a pagination_type of 'none' and the response as-is
         pagination_type = None
+        adaptive = isinstance(self.page_size, AdaptivePageSize) and method == 'get' and \
+            AdaptivePageSize.applies_to(params)
+        hooks = self.hooks.active
+        if hooks:
+            sdk_method = sdk_method or self.resolve_sdk_method()
+        call_url = url
+        call_start = time.monotonic()
+        page = 0
         while True:  # infinite loop in case of pagination - we will break the loop when needed
-            response = self.session.request(method, url, params=params, data=data, json=json)
-            self.__check_response_for_error(response)   # handle an error response
-            if self.__response_has_no_content(response):  # handle no content responses
-                return None
+            start = time.monotonic()
+            try:
+                response = self.__send(method, url, sdk_method=sdk_method, params=params, data=data, json=json)
+                responses.check_response_for_error(response)   # handle an error response
+            except (*adaptive_page_size_errors, requests.exceptions.ConnectionError) as e:
+                # a page which is too large can cause the backend to error out or time out so if the page size is
+                # being adapted retry the same records with a smaller page size
+                retry_params = self.page_size.retry_params(params) if adaptive and _page_may_be_too_large(e) else None
+                if not retry_params:
+                    raise
+                params = retry_params
+                continue
+
+            if responses.response_has_no_content(response):  # handle no content responses
+                yield 'none', None
+                return
 
             # handle secrets file download
-            lowercase_headers = {h.lower(): v.lower() for h, v in response.headers.items()}
-            content_disposition = lowercase_headers.get('content-disposition', '')
-            if 'attachment' in content_disposition and 'downloadfile' in url:
-                filename = response.headers.get('content-disposition').split('=')[1].replace('"', '').strip()
-                return {'filename': filename, 'content_bytes': bytes(response.content)}
+            download = responses.file_download(response, url)
+            if download:
+                yield 'none', download
+                return
 
             # load the result as a dict
             try:
                 result = response.json()
             except ValueError:  # includes simplejson.decoder.JSONDecodeError and native_json.decoder.JSONDecodeError
-                return response.content.decode('utf-8')
+                yield 'none', response.content.decode('utf-8')
+                return
+            latency = time.monotonic() - start
 
             # check on the pagination and iterate if required - we only need to check on this after the first
             # request - checking it each time can screw up the logic when dealing with pagination coming from
             # the response headers as the header won't exist which will mean pagination_type will change to 'none'
-            # which means we drop into the else block below and assign just the LAST page as the result, which
-            # is obviously not what we want to be doing.
-            if num_iterations == 1:
-                pagination_type = self.__pagination_type(response.headers, result)
-
-            if pagination_type == 'inline':
-                return_data += result['data']
-                count = result['count']
-                page = result['page']
-                size = result['size']
-                if size * (page + 1) >= count:  # if we have reached the max number of records time to break the loop
-                    break
-                else:  # else loop again after incrementing the page number by 1
-                    params['page'] = page + 1
-            elif pagination_type == 'audit':
-                return_data += result  # result is already a list
-                if 'next-page' not in response.headers.keys():
-                    break
-                url = response.headers['next-page']
-                params = {}  # the next-page header has all the URL parameters we need so unset them here
-            elif pagination_type == 'report':
-                return_data += result['data']
-                if 'next-page' not in response.headers.keys():
-                    break
-                url = response.headers['next-page']
-                params = {}  # the next-page header has all the URL parameters we need so unset them here
-            elif pagination_type == 'secmgr':
-                return_data += result['result']
-                next_page = result['pagination'].get('next', '')
-                if next_page == '':
-                    break
-                else:
-                    params['pageToken'] = next_page
-            else:  # we are not dealing with pagination so just return the response as-is
-                return_data = result
-                break
+            # which means we would return just the LAST page as the result, which is obviously not what we want
+            # to be doing.
+            if pagination_type is None:
+                pagination_type = responses.pagination_type(response.headers, result)
+
+            if pagination_type == 'none':  # we are not dealing with pagination so just return the response as-is
+                yield 'none', result
+                return
+
+            records, url, params = responses.next_page(pagination_type, response.headers, result, url, params)
+            page += 1
+            if hooks:
+                self.__on_page(sdk_method, method, call_url, page, records, call_start)
+            yield pagination_type, records
+            if not url:  # no more pages so time to break the loop
+                return
+
+            # inline pagination tells us how many pages remain after the first page so fetch them concurrently
+            if pagination_type == 'inline' and method == 'get' and self.pagination_concurrency > 1:
+                for records in self.__concurrent_inline_pages(url, params, result, sdk_method):
+                    page += 1
+                    if hooks:
+                        self.__on_page(sdk_method, method, call_url, page, records, call_start)
+                    yield 'inline', records
+                return
+
+            if adaptive and pagination_type == 'inline':
+                params = self.page_size.next_params(params, latency)
+
+    def __concurrent_inline_pages(self, url, params, first_page, sdk_method=None):
+        # fetch the remaining pages over a bounded pool of workers, keeping at most `pagination_concurrency` pages in
+        # flight so memory stays bounded when streaming, and yield the records of each page in order
+        last_page = math.ceil(first_page['count'] / first_page['size'])
+        with ThreadPoolExecutor(max_workers=self.pagination_concurrency) as executor:
+            in_flight = deque()
+            for page in range(params['page'], last_page):
+                # each page runs in a copy of the current context so the deadline of the call applies to it
+                in_flight.append(executor.submit(
+                    contextvars.copy_context().run, self.__inline_page, url, {**params, 'page': page}, sdk_method
+                ))
+                if len(in_flight) >= self.pagination_concurrency:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def __inline_page(self, url, params, sdk_method=None):
+        response = self.__send('get', url, sdk_method=sdk_method, params=params)
+        responses.check_response_for_error(response)
+        return response.json()['data']
 
-            num_iterations += 1
-
-        # finally return the response data
-        return return_data
+    def __request(self, method, url, params=None, data=None, json=None):
+        return_data = []
+        pages = 0
+        try:
+            for pagination_type, result in self.__pages(method, url, params=params, data=data, json=json):
+                pages += 1
+                if pagination_type == 'none':
+                    return result
+                return_data += result
+
+            # finally return the response data
+            return return_data
+        finally:
+            if self.metrics and pages:
+                self.metrics.record_call(method, url, pages)
 
     def get_root_environment_group(self, application_id: str) -> str:
         """Internal use only."""
@@ -131,6 +131,14 @@ class NotExecutingInAzureEnvironment(Exception):
     pass
 
 
+class DeadlineExceeded(Exception):
+    pass
+
+
+class CircuitOpen(Exception):
+    pass
+
+
 # from https://docs.britive.com/docs/restapi-status-codes
 allowed_exceptions = {
     400: InvalidRequest,
@@ -0,0 +1,183 @@
+import datetime
+import threading
+import time
+
+
+_missing = object()
+
+
+class TTLCache:
+    """
+    Thread safe in-memory cache where each entry expires `ttl` seconds after it was set.
+
+    Used to hold data which is expensive to retrieve and changes rarely (entitlements, identity attributes, etc.) so
+    repeated lookups do not require another API call. Entries can be dropped early with `invalidate`.
+    """
+
+    def __init__(self, ttl: float = 300):
+        """
+        :param ttl: The number of seconds an entry remains valid. Defaults to 300 seconds (5 minutes).
+        """
+
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: any, default: any = None) -> any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: any, value: any, ttl: float = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def get_or_set(self, key: any, factory, ttl: float = None) -> any:
+        """
+        Return the cached value for `key`, calling `factory()` to create (and cache) it if it is missing or expired.
+
+        `factory` is called without holding the lock so concurrent misses may each call it once.
+        """
+
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = factory()
+            self.set(key, value, ttl=ttl)
+        return value
+
+    def invalidate(self, key: any = _missing) -> None:
+        """
+        Drop the entry for `key`, or every entry if no key is provided.
+        """
+
+        with self._lock:
+            if key is _missing:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def _expiry(value: any) -> any:
+    # expiry timestamps are either ISO 8601 strings in UTC (2023-03-27T18:49:53.123Z) or epoch milliseconds
+    if isinstance(value, (int, float)):
+        return value / 1000
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+class CredentialCache(TTLCache):
+    """
+    Cache of the credentials of checked out profiles, keyed by (profile ID, environment ID, access type).
+
+    Each entry is a transaction (as returned by `MyAccess.checkout`) including its `credentials`. An entry remains
+    valid until `safety_margin` seconds before the earliest of the credential expiry and the transaction expiry.
+    Entries whose expiry cannot be determined are cached for `default_ttl` seconds, or not at all if `default_ttl` is
+    None.
+
+    With `background_refresh` the credentials of each entry are re-retrieved `refresh_ahead` seconds before the entry
+    would become invalid so frequent callers are always served from the cache. Refreshing stops once the refreshed
+    credentials no longer extend the expiry (for example because the checkout itself is about to expire), at which
+    point the entry lapses and the next checkout goes to the API.
+    """
+
+    def __init__(self, safety_margin: float = 300, default_ttl: float = None, background_refresh: bool = False,
+                 refresh_ahead: float = 60):
+        """
+        :param safety_margin: The number of seconds before expiry at which cached credentials are no longer served.
+            Defaults to 300 seconds (5 minutes).
+        :param default_ttl: The number of seconds to cache credentials for when their expiry cannot be determined.
+            Defaults to None (not cached).
+        :param background_refresh: Whether to refresh entries in a background thread ahead of their expiry. Defaults
+            to False.
+        :param refresh_ahead: How many seconds before an entry becomes invalid to refresh it. Defaults to 60 seconds.
+        """
+
+        super().__init__(ttl=default_ttl)
+        self.safety_margin = safety_margin
+        self.background_refresh = background_refresh
+        self.refresh_ahead = refresh_ahead
+        self._timers = {}
+
+    @staticmethod
+    def key(transaction: dict) -> tuple:
+        return transaction['papId'], transaction['environmentId'], transaction['accessType']
+
+    @staticmethod
+    def expires(transaction: dict) -> any:
+        credentials = transaction.get('credentials')
+        candidates = [_expiry(transaction.get('expiration'))]
+        if isinstance(credentials, dict):
+            candidates += [_expiry(credentials.get('expirationTime')), _expiry(credentials.get('expiration'))]
+        candidates = [c for c in candidates if c is not None]
+        return min(candidates) if candidates else None
+
+    def put(self, transaction: dict, refresh_func=None) -> None:
+        """
+        Cache a transaction including its `credentials`.
+
+        :param transaction: The transaction to cache.
+        :param refresh_func: Callable which returns the transaction with freshly retrieved `credentials`. Only used
+            with `background_refresh`.
+        :return: None
+        """
+
+        key = self.key(transaction)
+        expires = self.expires(transaction)
+        ttl = self.ttl if expires is None else expires - time.time() - self.safety_margin
+        if ttl is None or ttl <= 0:
+            return
+        self.set(key, transaction, ttl=ttl)
+        if self.background_refresh and refresh_func:
+            timer = threading.Timer(max(0.0, ttl - self.refresh_ahead), self._refresh, (key, refresh_func, expires))
+            timer.daemon = True
+            with self._lock:
+                previous = self._timers.pop(key, None)
+                self._timers[key] = timer
+            if previous:
+                previous.cancel()
+            timer.start()
+
+    def _refresh(self, key: tuple, refresh_func, expires: any) -> None:
+        try:
+            transaction = refresh_func()
+        except Exception:  # the entry will lapse and the next checkout goes to the API
+            return
+        refreshed = self.expires(transaction)
+        if expires is None or (refreshed is not None and refreshed > expires):
+            self.put(transaction, refresh_func=refresh_func)
+
+    def find(self, transaction_id: str) -> any:
+        """
+        Return the cached transaction with the given ID, if any.
+        """
+
+        with self._lock:
+            keys = [k for k, (value, _) in self._entries.items() if value['transactionId'] == transaction_id]
+        for key in keys:
+            transaction = self.get(key)
+            if transaction:
+                return transaction
+        return None
+
+    def invalidate(self, key: any = _missing) -> None:
+        with self._lock:
+            timers = list(self._timers.values()) if key is _missing else [self._timers.pop(key, None)]
+            if key is _missing:
+                self._timers.clear()
+        for timer in timers:
+            if timer:
+                timer.cancel()
+        super().invalidate(key)
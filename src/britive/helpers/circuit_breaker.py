@@ -0,0 +1,198 @@
+import re
+import threading
+import time
+from urllib.parse import urlparse
+from ..exceptions import CircuitOpen
+
+
+# status codes which indicate the backend (rather than the request) is failing - 429s are handled by rate limiting
+failure_status_codes = (500, 502, 503, 504)
+
+_version_segment = re.compile(r'^v\d+$')
+
+
+def endpoint_family(url: str) -> str:
+    """
+    Return the endpoint family (backend service) of `url` - the first segment of the path after `/api`, skipping any
+    version segment.
+
+    Example: https://example.britive-app.com/api/v1/secretmanager/vault/{id} -> secretmanager
+    """
+
+    segments = [s for s in urlparse(url).path.split('/') if s]
+    if segments and segments[0] == 'api':
+        segments = segments[1:]
+    for segment in segments:
+        if not _version_segment.match(segment):
+            return segment
+    return ''
+
+
+class CircuitBreaker:
+    """
+    Internal use only.
+
+    The circuit of a single endpoint family. See `CircuitBreakers`.
+    """
+
+    def __init__(self, family: str, breakers: 'CircuitBreakers'):
+        self.family = family
+        self.state = 'closed'
+        self._breakers = breakers
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> str:
+        # called with the lock held - the callback is invoked after it is released
+        previous, self.state = self.state, state
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+        if state == 'open':
+            self._opened = time.monotonic()
+        return previous
+
+    def _notify(self, previous: str, state: str) -> None:
+        if previous != state and self._breakers.on_state_change:
+            self._breakers.on_state_change(self.family, previous, state)
+
+    def allow(self) -> None:
+        """
+        Internal use only.
+
+        Allow a request through the circuit, or fail fast if it is open.
+
+        :raises: CircuitOpen - If the circuit is open, or half open with the maximum number of probes in flight.
+        """
+
+        previous = None
+        with self._lock:
+            if self.state == 'open':
+                remaining = self._opened + self._breakers.recovery_time - time.monotonic()
+                if remaining > 0:
+                    raise self._open_error(remaining)
+                previous = self._transition('half_open')
+            if self.state == 'half_open':
+                if self._probes >= self._breakers.half_open_max_calls:
+                    raise CircuitOpen(f'circuit for endpoint family {self.family} is half open and probing')
+                self._probes += 1
+        if previous:
+            self._notify(previous, 'half_open')
+
+    def record(self, success: any) -> None:
+        """
+        Internal use only.
+
+        Record the outcome of a request allowed through the circuit - True for success, False for failure or None if
+        the request did not complete for reasons unrelated to the backend (deadline exceeded, etc.).
+        """
+
+        previous = state = None
+        with self._lock:
+            if self.state == 'half_open':
+                self._probes = max(0, self._probes - 1)
+                if success is False:
+                    state = 'open'
+                elif success:
+                    self._successes += 1
+                    if self._successes >= self._breakers.success_threshold:
+                        state = 'closed'
+            elif self.state == 'closed':
+                if success is False:
+                    self._failures += 1
+                    if self._failures >= self._breakers.failure_threshold:
+                        state = 'open'
+                elif success:
+                    self._failures = 0
+            if state:
+                previous = self._transition(state)
+        if state:
+            self._notify(previous, state)
+
+    def failed(self) -> None:
+        """
+        Internal use only.
+
+        Record a failed attempt which is about to be retried.
+
+        :raises: CircuitOpen - If the circuit is open, so retries stop as soon as the backend is known to be failing.
+        """
+
+        self.record(False)
+        if self.state == 'open':
+            raise self._open_error(self._opened + self._breakers.recovery_time - time.monotonic())
+
+    def _open_error(self, remaining: float) -> CircuitOpen:
+        return CircuitOpen(f'circuit for endpoint family {self.family} is open - failing fast for another '
+                           f'{max(0.0, remaining):.1f} seconds')
+
+
+class CircuitBreakers:
+    """
+    Circuit breakers keyed by endpoint family (backend service) so requests to a failing backend fail fast with
+    `britive.exceptions.CircuitOpen` while requests to every other backend continue as normal.
+
+    The circuit of a family opens after `failure_threshold` consecutive failures (5xx responses or connection errors,
+    including automatic retries, which stop as soon as the circuit opens). After `recovery_time` seconds the circuit
+    is half open and allows `half_open_max_calls` requests at a time through as probes - `success_threshold`
+    successful probes close the circuit and a failed probe opens it again.
+
+    Instances are thread safe and can be shared by multiple clients.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30, success_threshold: int = 1,
+                 half_open_max_calls: int = 1, on_state_change=None, family=None):
+        """
+        :param failure_threshold: The number of consecutive failures which open a circuit. Defaults to 5.
+        :param recovery_time: The number of seconds a circuit stays open before allowing probes. Defaults to 30.
+        :param success_threshold: The number of successful probes which close a circuit. Defaults to 1.
+        :param half_open_max_calls: The number of probes allowed at a time while half open. Defaults to 1.
+        :param on_state_change: Optional callable invoked with (family, previous state, new state) whenever a circuit
+            changes state. States are `closed`, `open` and `half_open`.
+        :param family: Optional callable which returns the endpoint family of a URL. Defaults to `endpoint_family`.
+        """
+
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.success_threshold = success_threshold
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        self.family = family or endpoint_family
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Internal use only."""
+
+        family = self.family(url)
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(family, CircuitBreaker(family, self))
+        return breaker
+
+    def states(self) -> dict:
+        """
+        Return the state of the circuit of each endpoint family which has been called.
+
+        :return: Dict of endpoint family to `closed`, `open` or `half_open`.
+        """
+
+        return {family: breaker.state for family, breaker in sorted(self._breakers.items())}
+
+    def reset(self, family: str = None) -> None:
+        """
+        Close the circuit of `family`, or of every family if no family is provided.
+
+        :param family: The endpoint family, for example `secretmanager`.
+        :return: None
+        """
+
+        breakers = list(self._breakers.values()) if family is None else [self._breakers.get(family)]
+        for breaker in filter(None, breakers):
+            with breaker._lock:
+                previous = breaker._transition('closed')
+            breaker._notify(previous, 'closed')
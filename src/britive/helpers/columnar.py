@@ -0,0 +1,156 @@
+import json
+
+
+# column oriented output for large result sets (reports, audit logs) - a dict of lists holds each field name once and
+# avoids a dict per row, and can be handed to pyarrow/numpy/pandas without another pass over the data
+
+output_formats = ['records', 'columns', 'arrow', 'numpy']
+file_formats = ['parquet', 'feather']
+
+
+class ColumnBuilder:
+    """
+    Accumulates records (flat dicts) into a dict of equal length lists.
+
+    Fields which are missing from a record, or which first appear part way through, are filled with None. Duplicate
+    fieldnames are renamed (`name`, `name_2`, `name_3`, etc.) so every value of a row keeps its own column.
+    """
+
+    def __init__(self, fieldnames: list = None):
+        self.columns = {}
+        for name in fieldnames or []:
+            unique, count = name, 1
+            while unique in self.columns:
+                count += 1
+                unique = f'{name}_{count}'
+            self.columns[unique] = []
+        self.length = 0
+
+    def append(self, record: dict) -> None:
+        columns = self.columns
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * self.length
+            column.append(value)
+        self.length += 1
+        if len(record) != len(columns):  # some fields were not in this record
+            for column in columns.values():
+                if len(column) < self.length:
+                    column.append(None)
+
+    def append_row(self, row: list) -> None:
+        # the row values are in the same order as the fieldnames provided at construction
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+        self.length += 1
+        if len(row) < len(self.columns):
+            for column in list(self.columns.values())[len(row):]:
+                column.append(None)
+
+
+def _import_pyarrow():
+    # pyarrow is not a hard requirement of this SDK but is required for arrow output and parquet/feather files so
+    # checking to ensure it exists
+    try:
+        import pyarrow
+    except ImportError:
+        raise Exception('pyarrow required - please install pyarrow package to use arrow, parquet or feather output')
+    return pyarrow
+
+
+def _import_numpy():
+    # numpy is not a hard requirement of this SDK but is required for numpy output so checking to ensure it exists
+    try:
+        import numpy
+    except ImportError:
+        raise Exception('numpy required - please install numpy package to use numpy output')
+    return numpy
+
+
+def _as_strings(values: list) -> list:
+    return [
+        None if v is None else json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v) for v in values
+    ]
+
+
+def to_arrow(columns: dict):
+    """
+    Convert a dict of lists to a `pyarrow.Table`.
+
+    Columns which cannot be represented by a single Arrow type (for example a mix of numbers and strings) are
+    converted to strings.
+
+    :param columns: Dict of column name to list of values.
+    :return: `pyarrow.Table`
+    """
+
+    pyarrow = _import_pyarrow()
+    arrays = {}
+    for name, values in columns.items():
+        try:
+            arrays[name] = pyarrow.array(values)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            arrays[name] = pyarrow.array(_as_strings(values), type=pyarrow.string())
+    return pyarrow.table(arrays)
+
+
+def to_numpy(columns: dict) -> dict:
+    """
+    Convert a dict of lists to a dict of numpy arrays.
+
+    Columns holding only numbers, only booleans or only strings become typed arrays. Columns holding missing values or
+    a mix of types become arrays of dtype `object`.
+
+    :param columns: Dict of column name to list of values.
+    :return: Dict of column name to `numpy.ndarray`.
+    """
+
+    numpy = _import_numpy()
+    arrays = {}
+    for name, values in columns.items():
+        types = {type(v) for v in values}
+        if types and (types <= {int, float} or types in ({bool}, {str})):
+            arrays[name] = numpy.array(values)
+        else:
+            array = numpy.empty(len(values), dtype=object)
+            array[:] = values
+            arrays[name] = array
+    return arrays
+
+
+def convert(columns: dict, output_format: str) -> any:
+    """
+    Internal use only.
+
+    Convert a dict of lists to the requested `output_format` (`columns`, `arrow` or `numpy`).
+    """
+
+    if output_format == 'arrow':
+        return to_arrow(columns)
+    if output_format == 'numpy':
+        return to_numpy(columns)
+    return columns
+
+
+def write(columns: any, file: any, file_format: str = 'parquet') -> None:
+    """
+    Write column oriented data to a Parquet or Feather file.
+
+    :param columns: Dict of column name to list of values, or a `pyarrow.Table`.
+    :param file: Path to the file, or file-like object opened for writing bytes.
+    :param file_format: Either `parquet` or `feather`. Defaults to `parquet`.
+    :return: None
+    :raises: ValueError - If `file_format` is invalid.
+    """
+
+    if file_format not in file_formats:
+        raise ValueError(f'invalid file_format {file_format}')
+    pyarrow = _import_pyarrow()
+    table = columns if isinstance(columns, pyarrow.Table) else to_arrow(columns)
+    if file_format == 'parquet':
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, file)
+    else:
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, file)
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import threading
+from . import files
+
+
+class CursorStore:
+    """
+    Base class for persisting the position (cursor) of incremental readers such as `AuditLogs.tail`.
+
+    A cursor is a JSON serializable dict. Custom stores (Redis, DynamoDB, etc.) can be used by implementing
+    `get` and `set`.
+    """
+
+    def get(self, key: str) -> any:
+        """
+        Return the cursor stored under `key`.
+
+        :param key: The name of the cursor.
+        :return: The cursor dict or None if no cursor has been stored.
+        """
+
+        raise NotImplementedError()
+
+    def set(self, key: str, cursor: dict) -> None:
+        """
+        Store the cursor under `key`, replacing any existing cursor.
+
+        :param key: The name of the cursor.
+        :param cursor: The cursor dict.
+        :return: None
+        """
+
+        raise NotImplementedError()
+
+
+class MemoryCursorStore(CursorStore):
+    """Holds cursors in memory for the life of the process."""
+
+    def __init__(self):
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> any:
+        with self._lock:
+            return self._cursors.get(key)
+
+    def set(self, key: str, cursor: dict) -> None:
+        with self._lock:
+            self._cursors[key] = cursor
+
+
+class FileCursorStore(CursorStore):
+    """Persists cursors to a local JSON file. The file is replaced atomically on each update."""
+
+    def __init__(self, path: str):
+        """
+        :param path: The path of the JSON file. It will be created if it does not exist.
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, key: str) -> any:
+        with self._lock:
+            return self._read().get(key)
+
+    def set(self, key: str, cursor: dict) -> None:
+        with self._lock:
+            cursors = self._read()
+            cursors[key] = cursor
+            files.write_json(self.path, cursors)
+
+
+class SqliteCursorStore(CursorStore):
+    """Persists cursors to a local SQLite database which can be shared by multiple processes."""
+
+    def __init__(self, path: str, table: str = 'britive_cursors'):
+        """
+        :param path: The path of the SQLite database file. It will be created if it does not exist.
+        :param table: The name of the table in which cursors are stored. It will be created if it does not exist.
+        """
+
+        self.path = path
+        self.table = table
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    f'create table if not exists {self.table} (key text primary key, cursor text not null)'
+                )
+        finally:
+            connection.close()
+
+    def _connect(self):
+        # a new connection per operation keeps the store safe to use from multiple threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> any:
+        connection = self._connect()
+        try:
+            row = connection.execute(f'select cursor from {self.table} where key = ?', (key,)).fetchone()
+            return json.loads(row[0]) if row else None
+        finally:
+            connection.close()
+
+    def set(self, key: str, cursor: dict) -> None:
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    f'insert or replace into {self.table} (key, cursor) values (?, ?)',
+                    (key, json.dumps(cursor))
+                )
+        finally:
+            connection.close()
@@ -1,3 +1,7 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .rate_limit import TokenBucket
+
 
 class CustomAttributes:
     def __init__(self, principal):
@@ -56,19 +60,52 @@ class CustomAttributes:
             custom_attributes=custom_attributes
         )
 
-    def _build_list(self, operation: str, custom_attributes: dict):
-        # first get list of existing custom identity attributes and build some helpers
-        existing_attrs = [attr for attr in self.britive.identity_attributes.list() if not attr['builtIn']]
-        existing_attr_ids = [attr['id'] for attr in existing_attrs]
-        attrs_by_name = {attr['name']: attr['id'] for attr in existing_attrs}
+    def bulk_add(self, custom_attributes: any, max_workers: int = 10, requests_per_second: float = None) -> dict:
+        """
+        Adds custom attribute mappings to many Service Identities or Users concurrently.
+
+        Attribute names are resolved to IDs once for the whole run and the update of each principal is sent over a
+        bounded pool of workers. A failure to update one principal does not stop the others.
+
+        :param custom_attributes: A dict of principal ID to attribute map (as accepted by `add`), or an iterable of
+            (principal ID, attribute map) tuples such as a generator reading a CSV file or HR feed. An iterable is
+            consumed as updates are sent so the whole input is never held in memory.
+        :param max_workers: The maximum number of updates in flight at once. Defaults to 10.
+        :param requests_per_second: Optional cap on the rate at which updates are sent. Defaults to None (no cap).
+        :return: Dict with `succeeded`, the list of principal IDs which were updated, and `failed`, a dict of principal
+            ID to the exception raised while updating that principal.
+        """
+
+        return self._bulk_modify('add', custom_attributes, max_workers, requests_per_second)
+
+    def bulk_remove(self, custom_attributes: any, max_workers: int = 10, requests_per_second: float = None) -> dict:
+        """
+        Removes custom attribute mappings from many Service Identities or Users concurrently.
+
+        See `bulk_add` for details.
+
+        :param custom_attributes: A dict of principal ID to attribute map (as accepted by `remove`), or an iterable of
+            (principal ID, attribute map) tuples.
+        :param max_workers: The maximum number of updates in flight at once. Defaults to 10.
+        :param requests_per_second: Optional cap on the rate at which updates are sent. Defaults to None (no cap).
+        :return: Dict with `succeeded`, the list of principal IDs which were updated, and `failed`, a dict of principal
+            ID to the exception raised while updating that principal.
+        """
+
+        return self._bulk_modify('remove', custom_attributes, max_workers, requests_per_second)
 
+    def _build_list(self, operation: str, custom_attributes: dict, resolved: dict = None):
         # for each custom_attribute key/value provided ensure we convert to ID and build the list
         attrs_list = []
         for id_or_name, value in custom_attributes.items():
-            # obtain the custom attribute id
-            custom_attribute_id = id_or_name
-            if custom_attribute_id not in existing_attr_ids:
-                custom_attribute_id = attrs_by_name.get(custom_attribute_id, None)
+            # obtain the custom attribute id from the cached catalog of identity attributes - bulk operations also
+            # remember each resolution (including names which are not found) for the duration of the run
+            if resolved is not None and id_or_name in resolved:
+                custom_attribute_id = resolved[id_or_name]
+            else:
+                custom_attribute_id = self.britive.identity_attributes.resolve_id(id_or_name, custom_only=True)
+                if resolved is not None:
+                    resolved[id_or_name] = custom_attribute_id
             if not custom_attribute_id:
                 raise ValueError(f'custom identity attribute name {id_or_name} not found.')
 
@@ -94,3 +131,41 @@ class CustomAttributes:
             self.base_url.format(id=principal_id),
             json=self._build_list(operation=operation, custom_attributes=custom_attributes)
         )
+
+    def _bulk_modify(self, operation: str, custom_attributes: any, max_workers: int,
+                     requests_per_second: float) -> dict:
+        if operation not in ['add', 'remove']:
+            raise ValueError('operation must either be add or remove')
+
+        items = custom_attributes.items() if isinstance(custom_attributes, dict) else custom_attributes
+        bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        resolved = {}
+        results = {'succeeded': [], 'failed': {}}
+
+        def update(principal_id, attributes):
+            attrs_list = self._build_list(operation=operation, custom_attributes=attributes, resolved=resolved)
+            if bucket:
+                bucket.acquire()
+            self.britive.patch(self.base_url.format(id=principal_id), json=attrs_list)
+
+        def collect(futures):
+            for future in futures:
+                principal_id = in_flight.pop(future)
+                error = future.exception()
+                if error:
+                    results['failed'][principal_id] = error
+                else:
+                    results['succeeded'].append(principal_id)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+            for principal_id, attributes in items:
+                if len(in_flight) >= max_workers * 2:  # only read ahead of the workers a little to bound memory
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                # each update runs in a copy of the current context so the deadline of the call (if any) applies to it
+                in_flight[executor.submit(contextvars.copy_context().run, update, principal_id, attributes)] = \
+                    principal_id
+            done, _ = wait(in_flight)
+            collect(done)
+        return results
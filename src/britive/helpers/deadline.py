@@ -0,0 +1,63 @@
+import contextlib
+import contextvars
+import time
+from ..exceptions import DeadlineExceeded
+
+
+# tuple of (absolute monotonic time by which the current call must complete, the budget in seconds) - a context
+# variable so it applies to the thread (or asyncio task) which set it and can be carried over to worker threads
+_deadline = contextvars.ContextVar('britive_deadline', default=None)
+
+
+@contextlib.contextmanager
+def deadline(seconds: float):
+    """
+    Limit the SDK calls made within the context to `seconds` in total, covering every page, automatic retry and
+    status check (polling) of each call. A nested deadline cannot extend the deadline it is nested within.
+
+    Once the budget runs out the call raises `britive.exceptions.DeadlineExceeded`.
+
+    :param seconds: The time budget in seconds.
+    """
+
+    expires = (time.monotonic() + seconds, seconds)
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> any:
+    """
+    Internal use only.
+
+    Return the number of seconds left before the current deadline, or None if there is no deadline.
+
+    :raises: DeadlineExceeded - If the deadline has passed.
+    """
+
+    current = _deadline.get()
+    if current is None:
+        return None
+    expires, seconds = current
+    left = expires - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded(f'call did not complete within its deadline of {seconds} seconds')
+    return left
+
+
+def exceeded(wait: float) -> DeadlineExceeded:
+    """
+    Internal use only.
+
+    Return the exception to raise when waiting `wait` seconds (for example before a retry) would pass the current
+    deadline, or None if it would not (or there is no deadline).
+    """
+
+    left = remaining()
+    if left is not None and wait >= left:
+        return DeadlineExceeded(f'call would not complete within its deadline of {_deadline.get()[1]} seconds - '
+                                f'{left:.1f} seconds remain but the next retry is in {wait:.1f} seconds')
+    return None
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from . import files
+
+
+class FeatureCache:
+    """
+    Base class for caching the features of tenants (profiles v1 vs v2, etc.) so new clients do not need to query them.
+
+    Features are a JSON serializable dict keyed by tenant. Custom caches (Redis, DynamoDB, etc.) can be used by
+    implementing `get` and `set`.
+    """
+
+    def get(self, tenant: str) -> any:
+        """
+        Return the cached features of `tenant`.
+
+        :param tenant: The tenant (fully qualified host name).
+        :return: Dict of feature names to whether the feature is enabled, or None if not cached or expired.
+        """
+
+        raise NotImplementedError()
+
+    def set(self, tenant: str, features: dict) -> None:
+        """
+        Cache the features of `tenant`, replacing any cached features.
+
+        :param tenant: The tenant (fully qualified host name).
+        :param features: Dict of feature names to whether the feature is enabled.
+        :return: None
+        """
+
+        raise NotImplementedError()
+
+
+class MemoryFeatureCache(FeatureCache):
+    """Holds features in memory for the life of the process. Share an instance between clients to query once."""
+
+    def __init__(self, ttl: float = 3600):
+        """
+        :param ttl: The number of seconds cached features remain valid. Defaults to 3600 seconds (1 hour).
+        """
+
+        self.ttl = ttl
+        self._features = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant: str) -> any:
+        with self._lock:
+            entry = self._features.get(tenant)
+        if entry and time.time() - entry['cached'] < self.ttl:
+            return entry['features']
+        return None
+
+    def set(self, tenant: str, features: dict) -> None:
+        with self._lock:
+            self._features[tenant] = {'features': features, 'cached': time.time()}
+
+
+class FileFeatureCache(FeatureCache):
+    """
+    Persists features to a local JSON file so they are shared by every process on the host. The file is replaced
+    atomically on each update.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600):
+        """
+        :param path: The path of the JSON file. It will be created if it does not exist.
+        :param ttl: The number of seconds cached features remain valid. Defaults to 3600 seconds (1 hour).
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):  # a missing or corrupt cache is treated as empty
+            return {}
+
+    def get(self, tenant: str) -> any:
+        with self._lock:
+            entry = self._read().get(tenant)
+        if entry and time.time() - entry['cached'] < self.ttl:
+            return entry['features']
+        return None
+
+    def set(self, tenant: str, features: dict) -> None:
+        with self._lock:
+            cached = self._read()
+            cached[tenant] = {'features': features, 'cached': time.time()}
+            files.write_json(self.path, cached)
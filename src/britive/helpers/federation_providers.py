@@ -102,12 +102,11 @@ class AwsFederationProvider(FederationProvider):
         from ..britive import Britive  # doing import here to avoid circular dependency
         self.profile = profile
         self.duration = duration
-        temp_tenant = tenant
-        if not temp_tenant:
-            self.tenant = os.getenv('BRITIVE_TENANT')
+        temp_tenant = tenant or os.getenv('BRITIVE_TENANT')
         if not temp_tenant:
             print('Error: the aws federation provider requires the britive tenant as part of the signing algorithm')
             raise exceptions.TenantMissingError()
+        # resolved tenants are cached process-wide so this does not repeat the DNS lookups made for the client
         self.tenant = Britive.parse_tenant(temp_tenant).split(':')[0]  # remove the port if it exists
         super().__init__()
 
@@ -0,0 +1,32 @@
+import json
+import os
+import threading
+
+
+def write_json(path: str, value: any) -> None:
+    """
+    Internal use only.
+
+    Write `value` as JSON to `path` atomically - the content is written to a temporary file which then replaces `path`
+    so readers (including other processes) never see a partially written file.
+
+    :param path: The path of the file.
+    :param value: The JSON serializable value.
+    :return: None
+    :raises: TypeError - If `value` is not JSON serializable. Nothing is written.
+    """
+
+    content = json.dumps(value)
+    # the temporary file is per process and thread so concurrent writers (including separate instances sharing a path)
+    # never write to, or move, each other's file
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
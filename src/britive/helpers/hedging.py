@@ -0,0 +1,115 @@
+import fnmatch
+import math
+import threading
+from collections import deque
+from .metrics import url_template
+
+
+class HedgingPolicy:
+    """
+    Opt-in hedging of idempotent `GET` requests to cut tail latency.
+
+    When a request to an enabled endpoint has not received a response within the `percentile` latency of the recent
+    requests to that endpoint, a second identical request is sent and whichever responds first is used. The other is
+    cancelled (or, for a request already in flight with `Britive`, its response is discarded and its connection
+    released).
+
+    Hedging only starts once `minimum_samples` requests to an endpoint have been timed, and the extra load is capped by
+    a budget - each request to an enabled endpoint adds `max_extra_load` hedges to the budget (up to `burst`) and each
+    hedge spends one - so at most `max_extra_load` (10% by default) additional requests are sent over time.
+
+    Instances are thread safe and can be shared by multiple clients.
+    """
+
+    def __init__(self, endpoints: list = None, percentile: float = 95, minimum_delay: float = 0.05,
+                 max_extra_load: float = 0.1, burst: float = 10, window: int = 200, minimum_samples: int = 20):
+        """
+        :param endpoints: The endpoints to hedge, as URL templates (see `britive.helpers.metrics.url_template`) which
+            may include wildcards, for example `/api/access*` or `/api/v1/secretmanager/*`. Defaults to None (every
+            `GET` request).
+        :param percentile: The percentile of recent latencies after which a second request is sent. Defaults to 95.
+        :param minimum_delay: The minimum number of seconds to wait before sending a second request. Defaults to 0.05.
+        :param max_extra_load: The maximum fraction of additional requests hedging may send. Defaults to 0.1.
+        :param burst: The maximum number of hedges which may be sent in quick succession. Defaults to 10.
+        :param window: The number of recent latencies per endpoint used to compute the percentile. Defaults to 200.
+        :param minimum_samples: The number of latencies an endpoint needs before it is hedged. Defaults to 20.
+        """
+
+        if not 0 < percentile < 100:
+            raise ValueError('percentile must be between 0 and 100')
+        self.endpoints = endpoints
+        self.percentile = percentile
+        self.minimum_delay = minimum_delay
+        self.max_extra_load = max_extra_load
+        self.burst = burst
+        self.window = window
+        self.minimum_samples = minimum_samples
+        self.hedged = 0  # number of second requests sent
+        self.won = 0  # number of second requests which responded first
+        self._budget = burst
+        self._latencies = {}
+        self._enabled = {}
+        self._lock = threading.Lock()
+
+    def enabled(self, method: str, url: str) -> any:
+        """
+        Internal use only.
+
+        Return the URL template of the endpoint if requests to it may be hedged, else None.
+        """
+
+        if method.lower() != 'get':
+            return None
+        template = url_template(url)
+        enabled = self._enabled.get(template)
+        if enabled is None:
+            enabled = self._enabled[template] = self.endpoints is None or any(
+                fnmatch.fnmatchcase(template, pattern) for pattern in self.endpoints
+            )
+        return template if enabled else None
+
+    def delay(self, endpoint: str) -> any:
+        """
+        Internal use only.
+
+        Return the number of seconds to wait before hedging a request to `endpoint`, or None if it should not be hedged
+        (not enough latencies recorded yet). Also adds to the budget of hedges.
+        """
+
+        with self._lock:
+            self._budget = min(self.burst, self._budget + self.max_extra_load)
+            latencies = self._latencies.get(endpoint)
+            if latencies is None or len(latencies) < self.minimum_samples:
+                return None
+            ordered = sorted(latencies)
+        index = min(len(ordered) - 1, math.ceil(len(ordered) * self.percentile / 100) - 1)
+        return max(self.minimum_delay, ordered[index])
+
+    def allow(self) -> bool:
+        """
+        Internal use only.
+
+        Spend one hedge from the budget, returning whether a second request may be sent.
+        """
+
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self.hedged += 1
+            return True
+
+    def record(self, endpoint: str, latency: float) -> None:
+        """Internal use only."""
+
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+            latencies.append(latency)
+
+    def hedge_won(self) -> None:
+        """Internal use only."""
+
+        with self._lock:
+            self.won += 1
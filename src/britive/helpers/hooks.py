@@ -0,0 +1,72 @@
+import threading
+
+
+events = ['before_request', 'after_response', 'on_retry', 'on_page']
+
+
+class Hooks:
+    """
+    Callbacks invoked around the requests made by a client, for tracing, logging, custom metrics, etc.
+
+    Each callback is called with a single dict describing the event. Every event includes `event` (the name of the
+    event), `sdk_method` (the SDK method which made the request, for example `my_access.checkout`, or None when the
+    request was not made by a resource method), `method` (HTTP method) and `url`.
+
+        - before_request: Before each HTTP request is sent. Also includes `params`.
+        - after_response: After each HTTP request completes. Also includes `status_code`, `elapsed` (seconds),
+            `response` and `error` (the exception raised if no response was received, else None).
+        - on_retry: Before each automatic retry of a request (429/5xx responses and connection errors). Also includes
+            `status_code` (None if no response was received), `error` and `attempt` (1 for the first retry).
+        - on_page: After each page of a paginated result is retrieved. Also includes `page` (1 for the first page),
+            `records` (the number of records in the page) and `elapsed` (seconds since the call started).
+
+    Exceptions raised by a callback are not caught and will propagate to the caller of the SDK method.
+    """
+
+    def __init__(self):
+        self._callbacks = {event: [] for event in events}
+        self._lock = threading.Lock()
+
+    def register(self, event: str, callback=None):
+        """
+        Register a callback for an event. Can also be used as a decorator - `@britive.hooks.register('on_retry')`.
+
+        :param event: One of `before_request`, `after_response`, `on_retry` or `on_page`.
+        :param callback: Callable which accepts a single dict.
+        :return: The callback.
+        :raises: ValueError - If `event` is invalid.
+        """
+
+        if event not in events:
+            raise ValueError(f'invalid event {event}')
+        if callback is None:
+            return lambda func: self.register(event, func)
+        with self._lock:
+            # replace the list rather than append so callbacks can be emitted without holding the lock
+            self._callbacks[event] = self._callbacks[event] + [callback]
+        return callback
+
+    def unregister(self, event: str, callback) -> None:
+        """
+        Remove a previously registered callback.
+
+        :param event: The event the callback was registered for.
+        :param callback: The callback to remove.
+        :return: None
+        """
+
+        with self._lock:
+            self._callbacks[event] = [c for c in self._callbacks[event] if c is not callback]
+
+    @property
+    def active(self) -> bool:
+        return any(self._callbacks.values())
+
+    def emit(self, event: str, payload: dict) -> None:
+        """Internal use only."""
+
+        callbacks = self._callbacks[event]
+        if callbacks:
+            payload = {'event': event, **payload}
+            for callback in callbacks:
+                callback(payload)
@@ -0,0 +1,225 @@
+import json
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+
+# upper bounds (seconds) of the request latency histogram buckets
+latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# path segments which identify a specific resource (IDs, tokens, etc.) - any segment of 8+ characters containing a
+# digit, or consisting only of digits - are replaced with {id} so metrics are grouped per endpoint
+_id_segment = re.compile(r'^(?=[^/]*\d)[^/]{8,}$|^\d+$')
+
+
+def url_template(url: str) -> str:
+    """
+    Return the path of `url` with resource identifiers replaced by `{id}`.
+
+    Example: https://example.britive-app.com/api/users/a1b2c3d4e5f6g7h8/tags -> /api/users/{id}/tags
+    """
+
+    path = urlparse(url).path
+    return '/'.join('{id}' if _id_segment.match(segment) else segment for segment in path.split('/'))
+
+
+class _Endpoint:
+    __slots__ = ('requests', 'errors', 'status_codes', 'retries', 'bytes_received', 'latency_counts',
+                 'latency_sum', 'latency_max', 'calls', 'pages_sum', 'pages_max')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.status_codes = {}
+        self.retries = 0
+        self.bytes_received = 0
+        self.latency_counts = [0] * (len(latency_buckets) + 1)  # last bucket is +Inf
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.calls = 0
+        self.pages_sum = 0
+        self.pages_max = 0
+
+
+class Metrics:
+    """
+    Records per endpoint (HTTP method and URL template) statistics of the requests made by a client.
+
+    For each endpoint the following are recorded.
+
+        - requests: Number of HTTP requests, including each page of a paginated call.
+        - errors: Number of requests which failed to return a response or returned a 4xx/5xx status code.
+        - status_codes: Count of requests per status code (`error` when no response was received).
+        - retries: Number of automatic retries (429/5xx responses and connection errors).
+        - bytes_received: Total size of the response bodies.
+        - latency: Histogram of request latency in seconds.
+        - calls/pages: Number of logical calls (`britive.users.list()` is one call regardless of the number of pages)
+            and the number of pages retrieved per call.
+
+    Instances are thread safe and can be shared by multiple clients.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _endpoint(self, method: str, url: str) -> _Endpoint:
+        key = (method.upper(), url_template(url))
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints.setdefault(key, _Endpoint())
+        return endpoint
+
+    def record_request(self, method: str, url: str, status: any, latency: float, bytes_received: int = 0) -> None:
+        """Internal use only."""
+
+        index = len(latency_buckets)
+        for i, bound in enumerate(latency_buckets):
+            if latency <= bound:
+                index = i
+                break
+        with self._lock:
+            endpoint = self._endpoint(method, url)
+            endpoint.requests += 1
+            if status == 'error' or status >= 400:
+                endpoint.errors += 1
+            endpoint.status_codes[status] = endpoint.status_codes.get(status, 0) + 1
+            endpoint.bytes_received += bytes_received
+            endpoint.latency_counts[index] += 1
+            endpoint.latency_sum += latency
+            endpoint.latency_max = max(endpoint.latency_max, latency)
+
+    def record_bytes(self, method: str, url: str, bytes_received: int) -> None:
+        """Internal use only."""
+
+        with self._lock:
+            self._endpoint(method, url).bytes_received += bytes_received
+
+    def record_retry(self, method: str, url: str) -> None:
+        """Internal use only."""
+
+        with self._lock:
+            self._endpoint(method, url).retries += 1
+
+    def record_call(self, method: str, url: str, pages: int) -> None:
+        """Internal use only."""
+
+        with self._lock:
+            endpoint = self._endpoint(method, url)
+            endpoint.calls += 1
+            endpoint.pages_sum += pages
+            endpoint.pages_max = max(endpoint.pages_max, pages)
+
+    def reset(self) -> None:
+        """
+        Discard everything recorded so far.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._endpoints = {}
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """
+        Return a point in time copy of the recorded statistics.
+
+        :return: Dict of `METHOD /url/template` to the statistics of that endpoint. Latency bucket counts are
+            cumulative (as with Prometheus) and keyed by their upper bound in seconds.
+        """
+
+        with self._lock:
+            snapshot = {}
+            for (method, template), endpoint in sorted(self._endpoints.items(), key=lambda e: (e[0][1], e[0][0])):
+                buckets = {}
+                cumulative = 0
+                for bound, count in zip(list(latency_buckets) + ['+Inf'], endpoint.latency_counts):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                snapshot[f'{method} {template}'] = {
+                    'method': method,
+                    'endpoint': template,
+                    'requests': endpoint.requests,
+                    'errors': endpoint.errors,
+                    'status_codes': {str(k): v for k, v in endpoint.status_codes.items()},
+                    'retries': endpoint.retries,
+                    'bytes_received': endpoint.bytes_received,
+                    'latency': {
+                        'count': endpoint.requests,
+                        'sum': endpoint.latency_sum,
+                        'max': endpoint.latency_max,
+                        'buckets': buckets
+                    },
+                    'calls': endpoint.calls,
+                    'pages': {
+                        'sum': endpoint.pages_sum,
+                        'max': endpoint.pages_max
+                    }
+                }
+            return snapshot
+
+    def to_prometheus(self, prefix: str = 'britive') -> str:
+        """
+        Return the recorded statistics in the Prometheus text exposition format.
+
+        :param prefix: The prefix of each metric name. Defaults to `britive`.
+        :return: str
+        """
+
+        snapshot = self.snapshot()
+        metrics = [
+            ('requests_total', 'counter', 'Number of HTTP requests.'),
+            ('request_retries_total', 'counter', 'Number of automatic retries.'),
+            ('response_bytes_total', 'counter', 'Number of response body bytes received.'),
+            ('request_duration_seconds', 'histogram', 'HTTP request latency.'),
+            ('call_pages', 'summary', 'Number of pages retrieved per logical call.'),
+        ]
+        lines = []
+        for name, metric_type, description in metrics:
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for stats in snapshot.values():
+                labels = f'method="{stats["method"]}",endpoint="{stats["endpoint"]}"'
+                if name == 'requests_total':
+                    for status, count in stats['status_codes'].items():
+                        lines.append(f'{prefix}_{name}{{{labels},status="{status}"}} {count}')
+                elif name == 'request_retries_total':
+                    lines.append(f'{prefix}_{name}{{{labels}}} {stats["retries"]}')
+                elif name == 'response_bytes_total':
+                    lines.append(f'{prefix}_{name}{{{labels}}} {stats["bytes_received"]}')
+                elif name == 'request_duration_seconds':
+                    for bound, count in stats['latency']['buckets'].items():
+                        lines.append(f'{prefix}_{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{prefix}_{name}_sum{{{labels}}} {stats["latency"]["sum"]}')
+                    lines.append(f'{prefix}_{name}_count{{{labels}}} {stats["latency"]["count"]}')
+                elif stats['calls']:
+                    lines.append(f'{prefix}_{name}_sum{{{labels}}} {stats["pages"]["sum"]}')
+                    lines.append(f'{prefix}_{name}_count{{{labels}}} {stats["calls"]}')
+        return '\n'.join(lines) + '\n'
+
+    def to_jsonl(self) -> str:
+        """
+        Return the recorded statistics as JSON lines - one JSON document per endpoint, each including a `timestamp`.
+
+        :return: str
+        """
+
+        timestamp = time.time()
+        return ''.join(json.dumps({'timestamp': timestamp, **stats}) + '\n' for stats in self.snapshot().values())
+
+    def write_jsonl(self, file: any) -> None:
+        """
+        Append the recorded statistics, as JSON lines, to a file.
+
+        :param file: Path to the file, or file-like object opened for writing text.
+        :return: None
+        """
+
+        if isinstance(file, str):
+            with open(file, 'a') as f:
+                f.write(self.to_jsonl())
+        else:
+            file.write(self.to_jsonl())
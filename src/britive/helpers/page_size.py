@@ -0,0 +1,83 @@
+import threading
+
+
+class AdaptivePageSize:
+    """
+    Page size which adapts to the observed latency of paginated list requests.
+
+    The page size doubles (up to `maximum`) while pages are returned well within `target_latency` and halves (down to
+    `minimum`) when a page takes longer than `target_latency` or fails with a 5xx error or timeout. The learned page
+    size is shared by all list calls made by the client so later calls start from the tuned value.
+
+    Only list endpoints which paginate with `page` and `size` query parameters are resized between pages. As the
+    offset of the next page must remain aligned to the new page size a resize is deferred until the offset allows it.
+
+    Instances are thread safe.
+    """
+
+    def __init__(self, initial: int = 100, minimum: int = 25, maximum: int = 1000, target_latency: float = 2.0):
+        """
+        :param initial: The page size to start with. Defaults to 100.
+        :param minimum: The smallest page size to shrink to. Defaults to 25.
+        :param maximum: The largest page size to grow to. Defaults to 1000.
+        :param target_latency: The number of seconds a single page should take to retrieve. Defaults to 2 seconds.
+        """
+
+        if not minimum <= initial <= maximum:
+            raise ValueError('initial page size must be between minimum and maximum')
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.size = initial
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def applies_to(params: dict) -> bool:
+        return bool(params) and 'page' in params and 'size' in params
+
+    def record_success(self, size: int, latency: float) -> int:
+        with self._lock:
+            if latency > self.target_latency:
+                self.size = max(self.minimum, size // 2)
+            elif latency * 2 <= self.target_latency:  # doubling the page should still land within the target
+                self.size = min(self.maximum, max(self.size, size * 2))
+            return self.size
+
+    def record_failure(self, size: int) -> int:
+        with self._lock:
+            self.size = max(self.minimum, min(self.size, size // 2))
+            return self.size
+
+    @staticmethod
+    def resize(params: dict, size: int) -> dict:
+        # keep the same record offset - if the offset is not a multiple of the new size keep the current size
+        offset = params['page'] * params['size']
+        if offset % size != 0:
+            return params
+        return {**params, 'page': offset // size, 'size': size}
+
+    def next_params(self, params: dict, latency: float) -> dict:
+        """
+        Internal use only.
+
+        Record the latency of the page just retrieved and return the parameters for the next page.
+
+        :param params: The parameters of the next page (at the current page size).
+        :param latency: The number of seconds the previous page took to retrieve.
+        :return: The parameters of the next page, potentially at a new page size.
+        """
+
+        return self.resize(params, self.record_success(params['size'], latency))
+
+    def retry_params(self, params: dict) -> any:
+        """
+        Internal use only.
+
+        Record a failed page and return the parameters to retry the same records with a smaller page size.
+
+        :param params: The parameters of the failed page.
+        :return: The parameters to retry with, or None if the page size cannot be reduced any further.
+        """
+
+        retry = self.resize(params, self.record_failure(params['size']))
+        return None if retry['size'] >= params['size'] else retry
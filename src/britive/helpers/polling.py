@@ -0,0 +1,113 @@
+import random
+import time
+from . import deadline as deadlines
+
+
+class PollingStrategy:
+    """
+    Base class for the strategy used to wait between status checks while polling (checkouts, credential creation,
+    approvals, etc.).
+
+    A custom strategy can be provided to `Britive(polling=...)` by implementing `delays`.
+    """
+
+    def delays(self):
+        """
+        Return an iterator of the number of seconds to wait before each successive status check.
+        """
+
+        raise NotImplementedError()
+
+    def start(self, timeout: float = None, maximum: float = None) -> 'Poll':
+        """
+        Internal use only.
+
+        Start polling.
+
+        :param timeout: The number of seconds after which polling should stop. No sleep will extend past this deadline.
+        :param maximum: Optional cap on any single wait, in seconds.
+        :return: `Poll`
+        """
+
+        return Poll(self.delays(), timeout=timeout, maximum=maximum)
+
+
+class FixedInterval(PollingStrategy):
+    """Wait the same number of seconds between every status check."""
+
+    def __init__(self, interval: float = 1.0):
+        """
+        :param interval: The number of seconds between status checks. Defaults to 1 second.
+        """
+
+        self.interval = interval
+
+    def delays(self):
+        while True:
+            yield self.interval
+
+
+class ExponentialBackoff(PollingStrategy):
+    """
+    Start polling quickly and back off exponentially, with jitter, up to a maximum interval.
+
+    Fast transitions (such as credential creation) are picked up within tens of milliseconds while long waits (such as
+    approvals) only cost a handful of status checks.
+    """
+
+    def __init__(self, minimum: float = 0.05, maximum: float = 30.0, multiplier: float = 2.0, jitter: float = 0.2):
+        """
+        :param minimum: The number of seconds to wait before the first status check. Defaults to 0.05 seconds.
+        :param maximum: The largest number of seconds to wait between status checks. Defaults to 30 seconds.
+        :param multiplier: The factor by which the wait grows after each status check. Defaults to 2.
+        :param jitter: The fraction of each wait which is randomized (+/-) so many concurrent pollers do not check
+            in lock step. Defaults to 0.2.
+        """
+
+        if not 0 < minimum <= maximum:
+            raise ValueError('minimum must be greater than 0 and not greater than maximum')
+        self.minimum = minimum
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delays(self):
+        delay = self.minimum
+        while True:
+            yield min(self.maximum, max(self.minimum, delay * random.uniform(1 - self.jitter, 1 + self.jitter)))
+            delay = min(self.maximum, delay * self.multiplier)
+
+
+class Poll:
+    """
+    Internal use only.
+
+    A single polling operation - tracks the deadline and sleeps for the next delay of the strategy.
+    """
+
+    def __init__(self, delays, timeout: float = None, maximum: float = None):
+        self._delays = iter(delays)
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.maximum = maximum
+
+    @property
+    def remaining(self) -> any:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def next_delay(self) -> float:
+        delay = next(self._delays)
+        if self.maximum is not None:
+            delay = min(delay, self.maximum)
+        if self.deadline is not None:  # never sleep past the deadline
+            delay = min(delay, self.remaining)
+        left = deadlines.remaining()  # nor past the deadline of the call (raises DeadlineExceeded once it has passed)
+        if left is not None:
+            delay = min(delay, left)
+        return delay
+
+    def sleep(self) -> None:
+        time.sleep(self.next_delay())
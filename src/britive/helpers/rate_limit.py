@@ -0,0 +1,141 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket which allows `rate` requests per second on average with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        :param rate: The number of tokens added to the bucket per second.
+        :param capacity: The maximum number of tokens the bucket holds, which is the largest burst allowed. Defaults
+            to `rate` (one second worth of tokens), with a minimum of 1.
+        """
+
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+        self.rate = rate
+        self.capacity = max(1.0, rate if capacity is None else capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket without waiting.
+
+        :param tokens: The number of tokens to take. Defaults to 1.
+        :return: The number of seconds the caller must wait before the tokens are available.
+        """
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, waiting until they are available.
+
+        Tokens are reserved before waiting so concurrent callers queue up behind each other rather than all waking at
+        once.
+
+        :param tokens: The number of tokens to take. Defaults to 1.
+        :return: The number of seconds waited.
+        """
+
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter(TokenBucket):
+    """
+    Token bucket which paces the requests of one or more clients and tunes its rate from the responses of the API.
+
+    A 429 (Too Many Requests) response lowers the rate by a quarter, not below `minimum_rate`, and if it includes a
+    `Retry-After` header every request waits until it has elapsed rather than each worker backing off on its own. The
+    rate is lowered at most once per second (or `Retry-After` period) so a burst of 429s from requests which were
+    already in flight only counts once. Each successful response raises the rate a little, by `increase` requests per
+    second for every `rate` successful responses, up to `maximum_rate`.
+
+    Instances are thread safe. Use `for_tenant` to share a single instance between the clients of a tenant.
+    """
+
+    def __init__(self, rate: float, maximum_rate: float = None, minimum_rate: float = 1.0, increase: float = 1.0):
+        """
+        :param rate: The initial number of requests per second.
+        :param maximum_rate: The highest rate the limiter will raise the rate to. Defaults to `rate`, so the rate only
+            recovers back to where it started after being lowered. Provide a higher value to probe for more capacity.
+        :param minimum_rate: The lowest rate the limiter will lower the rate to. Defaults to 1 request per second.
+        :param increase: How much the rate is raised (in requests per second) for every `rate` successful responses.
+            Defaults to 1.
+        """
+
+        super().__init__(rate)
+        self.maximum_rate = rate if maximum_rate is None else maximum_rate
+        self.minimum_rate = min(minimum_rate, rate)
+        self.increase = increase
+        self._next_decrease = 0.0
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+
+    def throttled(self, retry_after: float = None) -> None:
+        """
+        Internal use only.
+
+        Record a 429 response - lower the rate and, if provided, hold all requests for `retry_after` seconds.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self._next_decrease:
+                self._set_rate(max(self.minimum_rate, self.rate * 0.75))
+                self._next_decrease = now + max(1.0, retry_after or 0)
+            if retry_after:
+                # empty the bucket by `retry_after` seconds worth of tokens so every caller waits out the pause and
+                # then queues at the new rate - concurrent 429s extend the pause to the longest rather than adding up
+                self._tokens = min(self._tokens, -retry_after * self.rate)
+
+    def succeeded(self) -> None:
+        """
+        Internal use only.
+
+        Record a successful response - raise the rate a little.
+        """
+
+        if self.rate < self.maximum_rate:
+            with self._lock:
+                self._set_rate(min(self.maximum_rate, self.rate + self.increase / self.rate))
+
+    @classmethod
+    def for_tenant(cls, tenant: str, rate: float, **kwargs) -> 'RateLimiter':
+        """
+        Return the process-wide rate limiter of `tenant`, creating it with the provided settings if it does not exist.
+        The settings of an existing limiter are left as-is.
+
+        :param tenant: The tenant (fully qualified host name).
+        :param rate: The initial number of requests per second.
+        :param kwargs: Other arguments of `RateLimiter`.
+        :return: `RateLimiter`
+        """
+
+        with _limiters_lock:
+            limiter = _limiters.get(tenant)
+            if limiter is None:
+                limiter = _limiters[tenant] = cls(rate, **kwargs)
+            return limiter
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
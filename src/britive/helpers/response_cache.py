@@ -0,0 +1,232 @@
+import copy
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from . import files
+from .metrics import url_template
+
+
+# endpoints (URL templates, which may include wildcards) of data which almost never changes, to the number of seconds
+# their responses are cached for
+default_ttls = {
+    '/api/system/apps': 3600,  # applications.catalog()
+    '/api/v1/policy-admin/consumers': 3600,  # system.consumers.list()
+    '/api/v1/policy-admin/actions': 3600,  # system.actions.list()
+    '/api/logs/fields': 3600,  # audit_logs.fields()
+    '/api/logs/operators': 3600,  # audit_logs.operators()
+    '/api/saml/settings': 600,  # saml.settings()
+    '/api/identity-providers': 300  # identity_providers.list()
+}
+
+
+class ResponseCache:
+    """
+    Base class for caching the responses of `GET` requests to endpoints which rarely change (catalogs, settings, etc.)
+    so repeated calls do not require another API call.
+
+    Only endpoints listed in `ttls` are cached. Responses are cached per tenant, identity (a hash of the token), URL
+    and query parameters so identities never share responses, and every cached response of an endpoint family (for
+    example `identity-providers`) is invalidated when the SDK makes a mutating (`POST`, `PATCH`, `PUT` or `DELETE`)
+    request to that family. Custom caches (Redis, etc.) can be used by implementing `get`, `set` and `invalidate`.
+    """
+
+    def __init__(self, ttls: dict = None):
+        """
+        :param ttls: Dict of endpoint (URL template as reported by `britive.metrics`, which may include wildcards) to
+            the number of seconds its responses are cached for. Defaults to `default_ttls`, which covers the catalog
+            and settings endpoints.
+        """
+
+        self.ttls = default_ttls if ttls is None else ttls
+        self.hits = 0
+        self.misses = 0
+        self._endpoint_ttls = {}
+
+    def ttl(self, url: str) -> any:
+        """
+        Internal use only.
+
+        Return the number of seconds the response of `url` is cached for, or None if it is not cached.
+        """
+
+        template = url_template(url)
+        if template not in self._endpoint_ttls:
+            ttl = self.ttls.get(template)
+            if ttl is None:
+                ttl = next((t for pattern, t in self.ttls.items() if fnmatch.fnmatchcase(template, pattern)), None)
+            self._endpoint_ttls[template] = ttl
+        return self._endpoint_ttls[template]
+
+    @staticmethod
+    def key(url: str, params: dict = None, tenant: str = None, token: str = None) -> str:
+        """
+        Internal use only.
+
+        Return the key of a request. Only a hash of the token is included so the token is never held by the cache.
+        """
+
+        identity = hashlib.sha256((token or '').encode()).hexdigest()
+        return f'{tenant}:{identity}:{url}?{urlencode(sorted((params or {}).items()), doseq=True)}'
+
+    def get(self, key: str) -> any:
+        """
+        Return the cached response for `key`.
+
+        :param key: The key of the request (tenant, identity, URL and query parameters).
+        :return: The decoded response, or None if not cached or expired.
+        """
+
+        raise NotImplementedError()
+
+    def set(self, key: str, value: any, ttl: float, family: str) -> None:
+        """
+        Cache the response for `key`, replacing any cached response.
+
+        :param key: The key of the request (tenant, identity, URL and query parameters).
+        :param value: The decoded response.
+        :param ttl: The number of seconds the response remains valid.
+        :param family: The endpoint family of the request, used to invalidate the response.
+        :return: None
+        """
+
+        raise NotImplementedError()
+
+    def invalidate(self, family: str = None) -> None:
+        """
+        Drop every cached response of an endpoint family, or every cached response if no family is provided.
+
+        :param family: The endpoint family, for example `identity-providers`.
+        :return: None
+        """
+
+        raise NotImplementedError()
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    Holds responses in memory for the life of the process, evicting the least recently used response once `maxsize`
+    responses are cached. Share an instance between clients to share cached responses.
+    """
+
+    def __init__(self, ttls: dict = None, maxsize: int = 256):
+        """
+        :param ttls: Dict of endpoint to the number of seconds its responses are cached for. See `ResponseCache`.
+        :param maxsize: The maximum number of responses held. Defaults to 256.
+        """
+
+        super().__init__(ttls)
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires, _ = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)  # so callers which modify the response do not modify the cached response
+
+    def set(self, key: str, value: any, ttl: float, family: str) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl, family)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, family: str = None) -> None:
+        with self._lock:
+            if family is None:
+                self._entries.clear()
+            else:
+                for key in [k for k, (_, _, f) in self._entries.items() if f == family]:
+                    del self._entries[key]
+
+
+class FileResponseCache(ResponseCache):
+    """
+    Persists responses to a local directory, one JSON file per response, so they are shared by every process on the
+    host. Files are replaced atomically and the oldest are removed once `maxsize` responses are cached.
+    """
+
+    def __init__(self, path: str, ttls: dict = None, maxsize: int = 1024):
+        """
+        :param path: The path of the directory. It will be created if it does not exist.
+        :param ttls: Dict of endpoint to the number of seconds its responses are cached for. See `ResponseCache`.
+        :param maxsize: The maximum number of responses held. Defaults to 1024.
+        """
+
+        super().__init__(ttls)
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        # the file name is derived from the key alone so a lookup opens a single file rather than listing them all
+        return os.path.join(self.path, f'{hashlib.sha256(key.encode()).hexdigest()}.json')
+
+    def _files(self) -> list:
+        return [f for f in os.listdir(self.path) if f.endswith('.json')]
+
+    def _read(self, name: str) -> any:
+        try:
+            with open(os.path.join(self.path, name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):  # a missing or corrupt response is treated as not cached
+            return None
+
+    def _modified(self, name: str) -> float:
+        try:
+            return os.stat(os.path.join(self.path, name)).st_mtime
+        except FileNotFoundError:  # already removed by another process
+            return 0
+
+    def get(self, key: str) -> any:
+        entry = self._read(self._file(key))
+        with self._lock:
+            if entry is None or time.time() >= entry['expires']:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry['value']
+
+    def set(self, key: str, value: any, ttl: float, family: str) -> None:
+        try:
+            files.write_json(self._file(key), {'value': value, 'expires': time.time() + ttl, 'family': family})
+        except TypeError:  # only JSON responses are persisted
+            return
+        names = self._files()
+        if len(names) > self.maxsize:
+            names.sort(key=self._modified)
+            for name in names[:len(names) - self.maxsize]:
+                self._remove(name)
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.path, name))
+        except FileNotFoundError:  # already removed by another process
+            pass
+
+    def invalidate(self, family: str = None) -> None:
+        # mutating requests are rare compared to lookups so the family is read from each response when invalidating
+        for name in self._files():
+            if family is None:
+                self._remove(name)
+                continue
+            entry = self._read(name)
+            if entry is None or entry.get('family') == family:
+                self._remove(name)
@@ -0,0 +1,93 @@
+import json as native_json
+from ..exceptions import allowed_exceptions
+
+
+# response handling shared by the synchronous `Britive` client and the `AsyncBritive` client - anything passed in as
+# `response` only needs to expose `status_code`, `headers` and `content` so both `requests` and `httpx` responses work
+
+
+def check_response_for_error(response):
+    if response.status_code in allowed_exceptions.keys():
+        try:
+            content = native_json.loads(response.content.decode('utf-8'))
+            message = f"{response.status_code} - " \
+                      f"{content.get('errorCode') or 'E0000'} - " \
+                      f"{content.get('message') or 'no message available'}"
+            if content.get('details'):
+                message += f" - {content.get('details')}"
+            raise allowed_exceptions[response.status_code](message)
+        except native_json.decoder.JSONDecodeError:
+            content = response.content.decode('utf-8')
+            message = f"{response.status_code} - {content}"
+            raise allowed_exceptions[response.status_code](message)
+
+
+def response_has_no_content(response):
+    # handle 204 No Content response
+    if response.status_code == 204:
+        return True
+
+    # handle empty 200 response
+    if response.status_code == 200 and len(response.content) == 0:
+        return True
+
+    return False
+
+
+def file_download(response, url):
+    # handle secrets file download - returns None if the response is not a file download
+    lowercase_headers = {h.lower(): v.lower() for h, v in response.headers.items()}
+    content_disposition = lowercase_headers.get('content-disposition', '')
+    if 'attachment' in content_disposition and 'downloadfile' in url:
+        filename = response.headers.get('content-disposition').split('=')[1].replace('"', '').strip()
+        return {'filename': filename, 'content_bytes': bytes(response.content)}
+    return None
+
+
+def pagination_type(headers, result):
+    is_dict = isinstance(result, dict)
+    has_next_page_header = 'next-page' in headers.keys()
+
+    if is_dict and all(x in result.keys() for x in ['count', 'page', 'size', 'data']):
+        return 'inline'
+    if is_dict and has_next_page_header and all(x in result.keys() for x in ['data', 'reportId']):  # reports
+        return 'report'
+    if has_next_page_header:  # this interesting way of paginating is how audit_logs.query() does it
+        return 'audit'
+    if is_dict and all(x in result.keys() for x in ['result', 'pagination']):
+        return 'secmgr'
+    return 'none'
+
+
+def next_page(pagination_type, headers, result, url, params):
+    """
+    Pull the records out of a single page of results and determine the request required to get the next page.
+
+    The provided `params` are never modified. A new dict is returned for the next page so the caller's parameters
+    remain untouched.
+
+    :param pagination_type: The pagination type as returned by `pagination_type()` for the first page.
+    :param headers: The headers of the response.
+    :param result: The decoded JSON body of the response.
+    :param url: The URL used to request the current page.
+    :param params: The query parameters used to request the current page.
+    :return: Tuple of (records, next_url, next_params). `next_url` will be None when there are no more pages.
+    """
+
+    if pagination_type == 'inline':
+        count = result['count']
+        page = result['page']
+        size = result['size']
+        if size * (page + 1) >= count:  # if we have reached the max number of records there are no more pages
+            return result['data'], None, None
+        return result['data'], url, {**(params or {}), 'page': page + 1}
+    if pagination_type in ['audit', 'report']:
+        records = result if pagination_type == 'audit' else result['data']  # audit result is already a list
+        # the next-page header has all the URL parameters we need so unset them here
+        return records, headers.get('next-page'), None
+    if pagination_type == 'secmgr':
+        next_page_token = result['pagination'].get('next', '')
+        if next_page_token == '':
+            return result['result'], None, None
+        return result['result'], url, {**(params or {}), 'pageToken': next_page_token}
+    raise ValueError(f'invalid pagination type {pagination_type}')
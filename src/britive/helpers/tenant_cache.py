@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from . import files
+
+
+_missing = object()
+
+
+class TenantCache:
+    """
+    Cache of tenants (as provided to `Britive`, for example `example`) to their validated host (for example
+    `example.britive-app.com`) so the DNS lookups used to resolve a tenant are only made once.
+
+    A single process-wide instance, `britive.helpers.tenant_cache.tenants`, is used by `Britive.parse_tenant`. Entries
+    can be pre-seeded with `set` (for example in a parent process before forking workers) and optionally persisted to
+    a JSON file with `persist` so every process on the host skips the lookups. Persistence can also be enabled by
+    setting environment variable BRITIVE_TENANT_CACHE_PATH to the path of the file.
+    """
+
+    def __init__(self, ttl: float = 86400):
+        """
+        :param ttl: The number of seconds a resolved tenant remains valid. Defaults to 86400 seconds (1 day).
+        """
+
+        self.ttl = ttl
+        self.path = None
+        self._entries = {}
+        self._loaded = True
+        self._lock = threading.Lock()
+
+    def persist(self, path: str) -> None:
+        """
+        Persist resolved tenants to a local JSON file, loading any tenants already in the file on first use. The file
+        is replaced atomically on each update.
+
+        :param path: The path of the JSON file. It will be created if it does not exist.
+        :return: None
+        """
+
+        with self._lock:
+            self.path = path
+            self._loaded = False
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):  # a missing or corrupt cache is treated as empty
+            return {}
+
+    def _load(self) -> None:
+        # read the file lazily so enabling persistence (including via the environment variable) costs nothing up front
+        if not self._loaded:
+            self._entries = {**self._read(), **self._entries}
+            self._loaded = True
+
+    def get(self, tenant: str) -> any:
+        """
+        Return the resolved host of `tenant`.
+
+        :param tenant: The tenant as provided to `Britive`.
+        :return: The host (including the port if one was provided) or None if not cached or expired.
+        """
+
+        with self._lock:
+            self._load()
+            entry = self._entries.get(tenant)
+        if entry and time.time() - entry['cached'] < self.ttl:
+            return entry['host']
+        return None
+
+    def set(self, tenant: str, host: str) -> None:
+        """
+        Cache the resolved host of `tenant`. Can be used to pre-seed the cache.
+
+        :param tenant: The tenant as provided to `Britive`.
+        :param host: The host (including the port if required) of the tenant.
+        :return: None
+        """
+
+        with self._lock:
+            self._load()
+            self._entries[tenant] = {'host': host, 'cached': time.time()}
+            if self.path:
+                entries = {**self._read(), tenant: self._entries[tenant]}
+                files.write_json(self.path, entries)
+
+    def invalidate(self, tenant: str = _missing) -> None:
+        """
+        Drop the cached host of `tenant`, or of every tenant if no tenant is provided. Persisted entries are left as-is
+        and will be replaced the next time the tenant is resolved.
+        """
+
+        with self._lock:
+            self._load()  # so the persisted entries of other tenants are still used
+            if tenant is _missing:
+                self._entries.clear()
+            else:
+                self._entries.pop(tenant, None)
+
+
+tenants = TenantCache()
+if os.getenv('BRITIVE_TENANT_CACHE_PATH'):
+    tenants.persist(os.getenv('BRITIVE_TENANT_CACHE_PATH'))
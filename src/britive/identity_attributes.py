@@ -1,8 +1,11 @@
+from .helpers.cache import TTLCache
+
 
 class IdentityAttributes:
     def __init__(self, britive):
         self.britive = britive
         self.base_url = f'{self.britive.base_url}/users/attributes'
+        self.catalog_cache = TTLCache(ttl=300)
 
     def list(self):
         """
@@ -35,7 +38,9 @@ class IdentityAttributes:
             'multiValued': multi_valued
         }
 
-        return self.britive.post(self.base_url, json=data)
+        attribute = self.britive.post(self.base_url, json=data)
+        self.invalidate_catalog()
+        return attribute
 
     def delete(self, attribute_id: str) -> None:
         """
@@ -45,5 +50,58 @@ class IdentityAttributes:
         :return: None
         """
 
-        return self.britive.delete(f'{self.base_url}/{attribute_id}')
+        response = self.britive.delete(f'{self.base_url}/{attribute_id}')
+        self.invalidate_catalog()
+        return response
+
+    def _catalog(self) -> dict:
+        # index the identity attributes by id and name, for all attributes and for custom attributes only, so the
+        # methods which accept attribute names do not have to list every attribute on each call
+        catalog = {
+            'all': {'ids': set(), 'ids_by_name': {}},
+            'custom': {'ids': set(), 'ids_by_name': {}}
+        }
+        for attribute in self.list():
+            kinds = ['all'] if attribute['builtIn'] else ['all', 'custom']
+            for kind in kinds:
+                catalog[kind]['ids'].add(attribute['id'])
+                catalog[kind]['ids_by_name'][attribute['name']] = attribute['id']
+        return catalog
+
+    def resolve_id(self, attribute_id_or_name: str, custom_only: bool = False) -> any:
+        """
+        Internal use only.
+
+        Return the ID of an identity attribute given its ID or name, from the cached catalog of identity attributes.
+
+        :param attribute_id_or_name: The ID or name of the identity attribute.
+        :param custom_only: Whether to only consider custom (not built-in) identity attributes.
+        :return: The ID of the identity attribute or None if not found.
+        """
+
+        kind = 'custom' if custom_only else 'all'
+        for attempt in range(2):
+            rebuilt = self.catalog_cache.get('catalog') is None
+            catalog = self.catalog_cache.get_or_set('catalog', self._catalog)[kind]
+            if attribute_id_or_name in catalog['ids']:
+                return attribute_id_or_name
+            attribute_id = catalog['ids_by_name'].get(attribute_id_or_name)
+            if attribute_id or rebuilt:
+                return attribute_id
+            self.invalidate_catalog()  # the attribute may have been created since the catalog was cached
+        return None
+
+    def invalidate_catalog(self) -> None:
+        """
+        Drop the cached catalog of identity attributes used to resolve attribute names to IDs.
+
+        The catalog is used by custom attributes, tag membership rules and workload identity provider attribute maps.
+        It is built from `list()` and cached for `catalog_cache.ttl` seconds (default 300). It is dropped automatically
+        by `create` and `delete`, and a name which is not found in a cached catalog rebuilds it once before failing,
+        so invalidation is only required when an attribute is deleted or renamed outside of this client.
+
+        :return: None
+        """
+
+        self.catalog_cache.invalidate()
 
@@ -1,6 +1,10 @@
 from . import exceptions
+import copy
+import contextvars
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Callable
+from .helpers.cache import CredentialCache, TTLCache
 
 
 approval_exceptions = {
@@ -27,6 +31,51 @@ class MyAccess:
     def __init__(self, britive):
         self.britive = britive
         self.base_url = f'{self.britive.base_url}/access'
+        self.entitlement_cache = TTLCache(ttl=300)
+        self.credential_cache = None
+
+    def enable_credential_cache(self, safety_margin: int = 300, default_ttl: int = None,
+                                background_refresh: bool = False, refresh_ahead: int = 60) -> CredentialCache:
+        """
+        Cache the credentials of checked out profiles until shortly before they expire.
+
+        Once enabled, `checkout(include_credentials=True)` (and the `_by_name` and `checkout_many` variants) return
+        cached credentials for a profile/environment/access type without any API calls, and `credentials()` returns
+        cached credentials for a transaction. Entries are valid until `safety_margin` seconds before the credentials
+        (or the checkout) expire. `checkin()` drops the entry for the transaction.
+
+        With `background_refresh` the credentials are re-retrieved `refresh_ahead` seconds before an entry becomes
+        invalid, so frequent callers never wait on a checkout.
+
+        :param safety_margin: The number of seconds before expiry at which cached credentials are no longer served.
+            Defaults to 300 seconds (5 minutes).
+        :param default_ttl: The number of seconds to cache credentials for when their expiry cannot be determined.
+            Defaults to None (not cached).
+        :param background_refresh: Whether to refresh credentials in a background thread ahead of their expiry.
+            Defaults to False.
+        :param refresh_ahead: How many seconds before an entry becomes invalid to refresh it. Defaults to 60 seconds.
+        :return: The `CredentialCache`, which is also available as `credential_cache`.
+        """
+
+        self.disable_credential_cache()
+        self.credential_cache = CredentialCache(
+            safety_margin=safety_margin,
+            default_ttl=default_ttl,
+            background_refresh=background_refresh,
+            refresh_ahead=refresh_ahead
+        )
+        return self.credential_cache
+
+    def disable_credential_cache(self) -> None:
+        """
+        Stop caching credentials, dropping any cached credentials and stopping any background refreshes.
+
+        :return: None
+        """
+
+        if self.credential_cache:
+            self.credential_cache.invalidate()
+        self.credential_cache = None
 
     def list_profiles(self):
         """
@@ -73,8 +122,9 @@ class MyAccess:
         :param application_name: Optionally the name of the application, which can help disambiguate between profiles
             with the same name across applications.
         :param justification: Optional justification if checking out the profile requires approval.
-        :param wait_time: The number of seconds to sleep/wait between polling to check if the profile checkout
-            was approved. Only applicable if `block_until_disposition = True`.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if the profile
+            checkout was approved. Polling starts quickly and backs off to this interval. Only applicable if
+            `block_until_disposition = True`.
         :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
             an exception. Only applicable if `block_until_disposition = True`.
         :param block_until_disposition: Should this method wait/block until the request has been either approved,
@@ -111,8 +161,9 @@ class MyAccess:
         :param profile_id: The ID of the profile. Use `list_profiles()` to obtain the eligible profiles.
         :param environment_id: The ID of the environment. Use `list_profiles()` to obtain the eligible environments.
         :param justification: Optional justification if checking out the profile requires approval.
-        :param wait_time: The number of seconds to sleep/wait between polling to check if the profile checkout
-            was approved. Only applicable if `block_until_disposition = True`.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if the profile
+            checkout was approved. Polling starts quickly and backs off to this interval. Only applicable if
+            `block_until_disposition = True`.
         :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
             an exception. Only applicable if `block_until_disposition = True`.
         :param block_until_disposition: Should this method wait/block until the request has been either approved,
@@ -136,15 +187,15 @@ class MyAccess:
 
         if block_until_disposition:
             try:
-                quit_time = time.time() + max_wait_time
+                poll = self.britive.polling.start(timeout=max_wait_time, maximum=wait_time)
                 while True:
                     status = self.approval_request_status(request_id=request_id)['status'].lower()
                     if status == 'pending':
-                        if time.time() >= quit_time:
+                        if poll.expired:
                             raise exceptions.ProfileApprovalMaxBlockTimeExceeded()
                         if progress_func:
                             progress_func('awaiting approval')
-                        time.sleep(wait_time)
+                        poll.sleep()
                         continue
                     else:  # status == timeout or approved or rejected or cancelled
                         return status
@@ -243,8 +294,8 @@ class MyAccess:
             contains the response from `credentials()`. Setting this parameter to `True` will result in a synchronous
             call vs. setting to `False` will allow for an async call.
         :param justification: Optional justification if checking out the profile requires approval.
-        :param wait_time: The number of seconds to sleep/wait between polling to check if the profile checkout
-            was approved.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if the profile
+            checkout was approved. Polling starts quickly and backs off to this interval.
         :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
             an exception.
         :param progress_func: An optional callback that will be invoked as the checkout process progresses.
@@ -262,6 +313,13 @@ class MyAccess:
             'accessType': 'PROGRAMMATIC' if programmatic else 'CONSOLE'
         }
 
+        if include_credentials and self.credential_cache:
+            cached = self.credential_cache.get((profile_id, environment_id, params['accessType']))
+            if cached:
+                if progress_func:
+                    progress_func('complete')
+                return copy.deepcopy(cached)
+
         data = {
             'justification': justification
         }
@@ -270,6 +328,7 @@ class MyAccess:
 
         # let's see if there is already a checked out profile
         progress_pending_checked_out_profiles_sent = False
+        poll = self.britive.polling.start(maximum=1)  # checkin is quick so never wait longer than a second
         while True:  # will break the loop when needed
             loop = False
             if progress_func and not progress_pending_checked_out_profiles_sent:
@@ -288,67 +347,40 @@ class MyAccess:
             if loop:
                 if progress_func:
                     progress_func('pending profile checkin')
-                time.sleep(1)
+                poll.sleep()
             else:
                 break
 
         # if not check it out
         if not transaction:
-            try:
-                transaction = self.britive.post(
-                    f'{self.base_url}/{profile_id}/environments/{environment_id}',
-                    params=params,
-                    json=data
-                )
-            except exceptions.InvalidRequest as e:
-                if 'MA-0009' in str(e):  # old approval process that coupled approval and checkout
-                    raise exceptions.ApprovalRequiredButNoJustificationProvided()
-                if 'MA-0010' in str(e):  # new approval process that de-couples approval from checkout
-                    # if the caller has not provided a justification we know for sure the call will fail
-                    # so raise the exception
-                    if not justification:
-                        raise exceptions.ApprovalRequiredButNoJustificationProvided()
-
-                    # request approval
-                    status = self.request_approval(
-                        profile_id=profile_id,
-                        environment_id=environment_id,
-                        justification=justification,
-                        wait_time=wait_time,
-                        max_wait_time=max_wait_time,
-                        block_until_disposition=True,
-                        progress_func=progress_func
-                    )
-
-                    # handle the response based on the value of status
-                    if status == 'approved':
-                        transaction = self.britive.post(
-                            f'{self.base_url}/{profile_id}/environments/{environment_id}',
-                            params=params,
-                            json=data
-                        )
-                    else:
-                        raise approval_exceptions[status]
-                else:
-                    raise e
+            transaction = self._submit_checkout(
+                profile_id=profile_id,
+                environment_id=environment_id,
+                params=params,
+                data=data,
+                justification=justification,
+                wait_time=wait_time,
+                max_wait_time=max_wait_time,
+                progress_func=progress_func
+            )
 
         transaction_id = transaction['transactionId']
 
         # this approval workflow logic is for the legacy workflow when approval and checkout were coupled together
         # this logic can be removed once the new approval logic is deployed to production.
         if transaction['status'] == 'checkOutInApproval':  # wait for approval or until timeout occurs
-            quit_time = time.time() + max_wait_time
+            poll = self.britive.polling.start(timeout=max_wait_time, maximum=wait_time)
             while True:
                 try:
                     transaction = self.get_checked_out_profile(transaction_id=transaction_id)
                 except exceptions.TransactionNotFound:
                     raise exceptions.ApprovalWorkflowRejected()
                 if transaction['status'] == 'checkOutInApproval':  # we have an approval workflow occurring
-                    if time.time() >= quit_time:
+                    if poll.expired:
                         raise exceptions.ApprovalWorkflowTimedOut()
                     if progress_func:
                         progress_func('awaiting approval')
-                    time.sleep(wait_time)
+                    poll.sleep()
                     continue
                 else:  # status == checkedOut
                     break
@@ -369,6 +401,44 @@ class MyAccess:
             progress_func('complete')
         return transaction
 
+    def _submit_checkout(self, profile_id: str, environment_id: str, params: dict, data: dict, justification: str,
+                         wait_time: int, max_wait_time: int, progress_func: Callable = None) -> dict:
+        try:
+            return self.britive.post(
+                f'{self.base_url}/{profile_id}/environments/{environment_id}',
+                params=params,
+                json=data
+            )
+        except exceptions.InvalidRequest as e:
+            if 'MA-0009' in str(e):  # old approval process that coupled approval and checkout
+                raise exceptions.ApprovalRequiredButNoJustificationProvided()
+            if 'MA-0010' in str(e):  # new approval process that de-couples approval from checkout
+                # if the caller has not provided a justification we know for sure the call will fail
+                # so raise the exception
+                if not justification:
+                    raise exceptions.ApprovalRequiredButNoJustificationProvided()
+
+                # request approval
+                status = self.request_approval(
+                    profile_id=profile_id,
+                    environment_id=environment_id,
+                    justification=justification,
+                    wait_time=wait_time,
+                    max_wait_time=max_wait_time,
+                    block_until_disposition=True,
+                    progress_func=progress_func
+                )
+
+                # handle the response based on the value of status
+                if status == 'approved':
+                    return self.britive.post(
+                        f'{self.base_url}/{profile_id}/environments/{environment_id}',
+                        params=params,
+                        json=data
+                    )
+                raise approval_exceptions[status]
+            raise e
+
     def checkout_by_name(self, profile_name: str, environment_name: str, application_name: str = None,
                          programmatic: bool = True, include_credentials: bool = False, justification: str = None,
                          wait_time: int = 60, max_wait_time: int = 600, progress_func: Callable = None) -> dict:
@@ -396,8 +466,8 @@ class MyAccess:
             contains the response from `credentials()`. Setting this parameter to `True` will result in a synchronous
             call vs. setting to `False` will allow for an async call.
         :param justification: Optional justification if checking out the profile requires approval.
-        :param wait_time: The number of seconds to sleep/wait between polling to check if the profile checkout
-            was approved.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if the profile
+            checkout was approved. Polling starts quickly and backs off to this interval.
         :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
             an exception.
         :param progress_func: An optional callback that will be invoked as the checkout process progresses.
@@ -420,6 +490,158 @@ class MyAccess:
             progress_func=progress_func
         )
 
+    def checkout_many(self, profiles: list, programmatic: bool = True, include_credentials: bool = True,
+                      justification: str = None, wait_time: int = 60, max_wait_time: int = 600,
+                      max_workers: int = 10):
+        """
+        Checkout many profiles at once.
+
+        All checkouts are submitted concurrently and the status of every pending checkout is then tracked by a single
+        polling loop (one call to `list_checked_out_profiles()` per poll regardless of how many checkouts are
+        pending, backing off as described for the `polling` parameter of `Britive`). Each checked out profile is yielded
+        as soon as it, and optionally its credentials, are ready so the total time taken stays close to that of the
+        slowest single checkout.
+
+        Each item of `profiles` is a dict identifying a profile/environment pair by either IDs or names.
+
+            - `profile_id` and `environment_id`
+            - `profile_name`, `environment_name` and optionally `application_name`
+
+        An item may also include `programmatic` and/or `justification` to override the values provided to this method
+        for that item only.
+
+        As with `checkout()`, profiles which are already checked out are not checked out again and profiles requiring
+        approval are checked out once the approval request has been approved. The first checkout to fail raises its
+        exception from the generator.
+
+        :param profiles: List of dicts identifying the profile/environment pairs to checkout.
+        :param programmatic: True for programmatic credential checkout. False for console checkout.
+        :param include_credentials: True (default) if the credentials of each checkout should be retrieved and included
+            under the `credentials` key of each yielded transaction.
+        :param justification: Optional justification if checking out a profile requires approval.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if a profile
+            checkout was approved. Polling starts quickly and backs off to this interval.
+        :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
+            an exception.
+        :param max_workers: The maximum number of checkout and credential requests in flight at once. Defaults to 10.
+        :return: Generator of checked out profile details (dicts), in the order in which they become ready.
+        :raises ValueError: if a profile/environment pair identified by name cannot be found.
+        :raises ApprovalRequiredButNoJustificationProvided: if approval is required but no justification is provided.
+        :raises ApprovalWorkflowTimedOut: if max_wait_time has been reached while waiting for approval.
+        :raises ApprovalWorkflowRejected: if the request to check out a profile was rejected.
+        """
+
+        # resolve everything up front so invalid names are raised before anything is checked out
+        targets = []
+        for profile in profiles:
+            if 'profile_id' in profile:
+                ids = profile
+            else:
+                ids = self._get_profile_and_environment_ids_given_names(
+                    profile['profile_name'],
+                    profile['environment_name'],
+                    profile.get('application_name')
+                )
+            targets.append({
+                'profile_id': ids['profile_id'],
+                'environment_id': ids['environment_id'],
+                'access_type': 'PROGRAMMATIC' if profile.get('programmatic', programmatic) else 'CONSOLE',
+                'justification': profile.get('justification', justification)
+            })
+
+        return self._checkout_many(targets, include_credentials, wait_time, max_wait_time, max_workers)
+
+    def _checkout_many(self, targets: list, include_credentials: bool, wait_time: int, max_wait_time: int,
+                       max_workers: int):
+        unsubmitted = list(range(len(targets)))  # waiting on an earlier checkout of the profile to be checked in
+        transactions = {}  # target index to transaction which is not yet checked out
+        approval_quit_times = {}
+        submitting = {}  # future to target index
+        fetching = {}  # future to transaction
+
+        if include_credentials and self.credential_cache:
+            for index in list(unsubmitted):
+                target = targets[index]
+                key = (target['profile_id'], target['environment_id'], target['access_type'])
+                cached = self.credential_cache.get(key)
+                if cached:
+                    unsubmitted.remove(index)
+                    yield copy.deepcopy(cached)
+            if not unsubmitted:
+                return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            statuses = self.list_checked_out_profiles()
+            # pending checkouts are usually waiting on credential creation which is quick so never wait longer than a
+            # second (the legacy approval workflow is the exception but is rare)
+            poll = self.britive.polling.start(maximum=1)
+            next_poll = time.time() + poll.next_delay()
+            while unsubmitted or transactions or submitting or fetching:
+                if (unsubmitted or transactions) and time.time() >= next_poll:
+                    statuses = self.list_checked_out_profiles()
+                    next_poll = time.time() + poll.next_delay()
+                    latest = {t['transactionId']: t for t in statuses}
+                    for index, transaction in transactions.items():
+                        if transaction['transactionId'] in latest:
+                            transactions[index] = latest[transaction['transactionId']]
+                        elif transaction['status'] == 'checkOutInApproval':
+                            raise exceptions.ApprovalWorkflowRejected()
+                        else:
+                            raise exceptions.TransactionNotFound()
+
+                for index in list(unsubmitted):
+                    target = targets[index]
+                    transaction, checking_in = _checked_out_transaction(statuses, target)
+                    if transaction:
+                        transactions[index] = transaction
+                    elif not checking_in:
+                        future = executor.submit(
+                            contextvars.copy_context().run,  # so the deadline of the call (if any) applies
+                            self._submit_checkout,
+                            profile_id=target['profile_id'],
+                            environment_id=target['environment_id'],
+                            params={'accessType': target['access_type']},
+                            data={'justification': target['justification']},
+                            justification=target['justification'],
+                            wait_time=wait_time,
+                            max_wait_time=max_wait_time
+                        )
+                        submitting[future] = index
+                    else:
+                        continue
+                    unsubmitted.remove(index)
+
+                for index, transaction in list(transactions.items()):
+                    status = transaction['status']
+                    if status == 'checkedOut':
+                        del transactions[index]
+                        if include_credentials:
+                            fetching[executor.submit(
+                                contextvars.copy_context().run, self._transaction_credentials, transaction
+                            )] = transaction
+                        else:
+                            yield transaction
+                    elif status == 'checkOutInApproval':  # legacy approval workflow
+                        quit_time = approval_quit_times.setdefault(index, time.time() + max_wait_time)
+                        if time.time() >= quit_time:
+                            raise exceptions.ApprovalWorkflowTimedOut()
+
+                # block until a request completes or it is time to poll again
+                timeout = max(0.0, next_poll - time.time()) if unsubmitted or transactions else None
+                if not submitting and not fetching:
+                    if timeout:
+                        time.sleep(timeout)
+                    continue
+                done, _ = wait(list(submitting) + list(fetching), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in submitting:
+                        transactions[submitting.pop(future)] = future.result()
+                    else:
+                        transaction = fetching.pop(future)
+                        transaction['credentials'] = future.result()
+                        self._cache_credentials(transaction, transaction['credentials'])
+                        yield transaction
+
     def credentials(self, transaction_id: str, transaction: dict = None, return_transaction_details: bool = False,
                     progress_func: Callable = None) -> any:
         """
@@ -436,29 +658,52 @@ class MyAccess:
         :return: Credentials associated with the checked out profile represented by the specified transaction.
         """
 
+        if self.credential_cache:
+            cached = self.credential_cache.find(transaction_id)
+            if cached:
+                cached = copy.deepcopy(cached)
+                creds = cached.pop('credentials')
+                return (creds, cached) if return_transaction_details else creds
+
         # step 1: get the details of the transaction so we can make the appropriate API call
         # we only need to get the details of the transaction if they are not already provided
         # or the transaction is not in the state of checkedOut
         if not transaction or transaction['status'] != 'checkedOut':
+            poll = self.britive.polling.start(maximum=1)  # credential creation is quick so wait a second at most
             while True:
                 transaction = self.get_checked_out_profile(transaction_id=transaction_id)
                 if transaction['status'] == 'checkOutSubmitted':  # async checkout process
                     if progress_func:
                         progress_func('credential creation')
-                    time.sleep(1)
+                    poll.sleep()
                     continue
                 else:  # status == checkedOut
                     break
 
         # step 2: make the proper API call
-        url_part = 'url' if transaction['accessType'] == 'CONSOLE' else 'tokens'
-        creds = self.britive.get(f'{self.base_url}/{transaction_id}/{url_part}')
+        creds = self._transaction_credentials(transaction)
+        self._cache_credentials(transaction, creds)
 
         if return_transaction_details:
             return creds, transaction
         else:
             return creds
 
+    def _transaction_credentials(self, transaction: dict) -> any:
+        url_part = 'url' if transaction['accessType'] == 'CONSOLE' else 'tokens'
+        return self.britive.get(f'{self.base_url}/{transaction["transactionId"]}/{url_part}')
+
+    def _cache_credentials(self, transaction: dict, credentials: any) -> None:
+        if not self.credential_cache:
+            return
+        transaction_id = transaction['transactionId']
+
+        def refresh():
+            latest = self.get_checked_out_profile(transaction_id=transaction_id)
+            return {**latest, 'credentials': self._transaction_credentials(latest)}
+
+        self.credential_cache.put({**transaction, 'credentials': credentials}, refresh_func=refresh)
+
     def checkin(self, transaction_id: str) -> dict:
         """
         Check in a checked out profile.
@@ -470,6 +715,10 @@ class MyAccess:
         params = {
             'type': 'API'
         }
+        if self.credential_cache:
+            cached = self.credential_cache.find(transaction_id)
+            if cached:
+                self.credential_cache.invalidate(CredentialCache.key(cached))
         return self.britive.put(f'{self.base_url}/{transaction_id}', params=params)
 
     def checkin_by_name(self, profile_name: str, environment_name: str, application_name: str = None) -> dict:
@@ -522,51 +771,92 @@ class MyAccess:
 
         return self.britive.post(f'{self.britive.base_url}/auth/validate')['authenticationResult']
 
-    def _get_profile_and_environment_ids_given_names(self, profile_name: str, environment_name: str,
-                                                     application_name: str = None) -> dict:
-        ids = None
-        profile_found = False
-        environment_found = False
-
-        # collect relevant profile/environment combinations to which the identity is entitled
+    def _entitlement_index(self) -> dict:
+        # index the profile/environment pairs the identity is entitled to by lowercase names so name based lookups
+        # do not have to scan every application, profile and environment
+        index = {
+            'ids': {},  # (application, profile, environment) to ids
+            'ids_by_name': {},  # (profile, environment) to list of ids across all applications
+            'applications': {}  # profile to set of applications in which it exists
+        }
         for app in self.list_profiles():
             app_name = app['appName'].lower()
-            if application_name and app_name != application_name.lower():  # restrict to one app if provided
-                continue
             for profile in app['profiles']:
                 prof_name = profile['profileName'].lower()
-                prof_id = profile['profileId']
-
-                if prof_name == profile_name.lower():
-                    profile_found = True
-                    for env in profile['environments']:
-                        env_name = env['environmentName'].lower()
-                        env_id = env['environmentId']
-
-                        if env_name == environment_name.lower():
-                            environment_found = True
-                            # lets check to see if `ids` has already been set
-                            # if so we should error because we don't know which name combo to use
-                            if ids:
-                                raise ValueError(
-                                    f'multiple combinations of profile `{profile_name}` and environment '
-                                    f'`{environment_name}` exist so no unique combination can be determined. Please '
-                                    f'provide the optional parameter `application_name` to clarify which application '
-                                    f'the environment belongs to.'
-                                )
-                            # set the IDs the first time
-                            ids = {
-                                'profile_id': prof_id,
-                                'environment_id': env_id
-                            }
-
-        # do some error checking
-        if not profile_found:
-            raise ValueError(f'profile `{profile_name}` not found.')
-
-        if profile_found and not environment_found:
+                index['applications'].setdefault(prof_name, set()).add(app_name)
+                for env in profile['environments']:
+                    env_name = env['environmentName'].lower()
+                    ids = {
+                        'profile_id': profile['profileId'],
+                        'environment_id': env['environmentId']
+                    }
+                    index['ids_by_name'].setdefault((prof_name, env_name), []).append(ids)
+                    index['ids'].setdefault((app_name, prof_name, env_name), []).append(ids)
+        return index
+
+    def invalidate_entitlements(self) -> None:
+        """
+        Drop the cached index of profiles/environments used by the `*_by_name` methods.
+
+        The index is built from `list_profiles()` and cached for `entitlement_cache.ttl` seconds (default 300). A
+        lookup which does not find a match in a cached index rebuilds it before failing (at most once per `ttl`), so
+        invalidation is only required when an entitlement is removed or renamed.
+
+        :return: None
+        """
+
+        self.entitlement_cache.invalidate()
+
+    def _get_profile_and_environment_ids_given_names(self, profile_name: str, environment_name: str,
+                                                     application_name: str = None) -> dict:
+        profile_key = profile_name.lower()
+        environment_key = environment_name.lower()
+        application_key = application_name.lower() if application_name else None
+
+        rebuilt = self.entitlement_cache.get('index') is None
+        index = self.entitlement_cache.get_or_set('index', self._entitlement_index)
+        if application_key:
+            matches = index['ids'].get((application_key, profile_key, environment_key), [])
+        else:
+            matches = index['ids_by_name'].get((profile_key, environment_key), [])
+
+        if not matches and not rebuilt and not self.entitlement_cache.get('refreshed'):
+            # the cached index may pre-date the entitlement so rebuild it and try again - at most once per ttl so
+            # repeated lookups of names which do not exist do not rebuild the index every time
+            self.entitlement_cache.invalidate('index')
+            self.entitlement_cache.set('refreshed', True)
+            return self._get_profile_and_environment_ids_given_names(profile_name, environment_name, application_name)
+
+        if len(matches) > 1:
+            # we don't know which name combo to use
+            raise ValueError(
+                f'multiple combinations of profile `{profile_name}` and environment '
+                f'`{environment_name}` exist so no unique combination can be determined. Please '
+                f'provide the optional parameter `application_name` to clarify which application '
+                f'the environment belongs to.'
+            )
+
+        if not matches:
+            applications = index['applications'].get(profile_key, set())
+            if not applications or (application_key and application_key not in applications):
+                raise ValueError(f'profile `{profile_name}` not found.')
             raise ValueError(f'profile `{profile_name}` found but not in environment `{environment_name}`.')
 
         # if we get here we found both the profile and environment and they are unique so
-        # we can use the `ids` dict with confidence
-        return ids
+        # we can use the ids with confidence
+        return dict(matches[0])
+
+
+def _checked_out_transaction(statuses: list, target: dict) -> tuple:
+    # the active transaction for the profile/environment/access type, and whether an earlier checkout of it is still
+    # being checked in (in which case it cannot be checked out yet)
+    checking_in = False
+    for transaction in statuses:
+        right_profile = transaction['papId'] == target['profile_id']
+        right_env = transaction['environmentId'] == target['environment_id']
+        right_type = transaction['accessType'] == target['access_type']
+        if all([right_profile, right_env, right_type]):
+            if transaction['checkedIn'] is None:
+                return transaction, False
+            checking_in = True
+    return None, checking_in
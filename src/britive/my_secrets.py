@@ -1,5 +1,4 @@
 from datetime import datetime, timezone, timedelta
-import time
 from . import exceptions
 
 
@@ -59,8 +58,8 @@ class MySecrets:
 
         :param path: The path to the secret. Include the leading /.
         :param justification: Optional justification if viewing the secret requires approval.
-        :param wait_time: The number of seconds to sleep/wait between polling to check if the secret
-            request was approved.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if the secret
+            request was approved. Polling starts quickly and backs off to this interval.
         :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
             an exception.
         :return: Details of the decrypted secret.
@@ -70,7 +69,7 @@ class MySecrets:
         """
 
         vault_id = self.__get_vault_id()
-        quit_time = datetime.now(timezone.utc) + timedelta(seconds=max_wait_time)
+        poll = self.britive.polling.start(timeout=max_wait_time, maximum=wait_time)
         params = {
             'path': path
         }
@@ -81,7 +80,7 @@ class MySecrets:
         while True:  # this is not loop forever due to exceptions raised or returning the secret value
             try:
                 # handle when the time has expired waiting for approval
-                if datetime.now(timezone.utc) >= quit_time:
+                if poll.expired:
                     raise exceptions.ApprovalWorkflowTimedOut()
 
                 # attempt to get the secret value and return it
@@ -97,7 +96,7 @@ class MySecrets:
                 if 'PE-0002' in str(e):
                     raise exceptions.AccessDenied()
                 if 'PE-0010' in str(e):  # approval to view the secret is pending...
-                    time.sleep(wait_time)
+                    poll.sleep()
                 else:
                     raise e
 
@@ -113,8 +112,8 @@ class MySecrets:
 
         :param path: The path to the secret. Include the leading /.
         :param justification: Optional justification if viewing the secret requires approval.
-        :param wait_time: The number of seconds to sleep/wait between polling to check if the secret
-            request was approved.
+        :param wait_time: The maximum number of seconds to sleep/wait between polling to check if the secret
+            request was approved. Polling starts quickly and backs off to this interval.
         :param max_wait_time: The maximum number of seconds to wait for an approval before throwing
             an exception.
         :return: Dict containing the filename of the downloaded file and the content of the file as bytes.
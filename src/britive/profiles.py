@@ -79,25 +79,32 @@ class Profiles:
 
         return self.britive.post(f'{self.base_url}/{application_id}/paps', json=data)
 
-    def list(self, application_id: str, filter_expression: str = None) -> list:
+    def list(self, application_id: str, filter_expression: str = None, stream: bool = False,
+             page_size: int = None) -> list:
         """
         Return an optionally filtered list of profiles associated with the specified application.
 
         :param application_id: The ID of the application.
         :param filter_expression: Can filter based on `name`, `status`, `integrity check`. Valid operators are `eq` and
             `co`. Example: name co "Dev Account"
+        :param stream: If True a generator is returned which yields profiles as each page of results is retrieved
+            instead of a list of all profiles. Defaults to False.
+        :param page_size: The number of records to request per page. Defaults to the page size configured on the
+            client, or 100 if none is configured.
         :return: List of profiles.
         """
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(page_size),
             'view': 'summary'  # this is required - omitting it results in a 400 not authorized error
         }
 
         if filter_expression:
             params['filter'] = filter_expression
 
+        if stream:
+            return self.britive.iter_get(f'{self.base_url}/{application_id}/paps', params=params)
         return self.britive.get(f'{self.base_url}/{application_id}/paps', params=params)
 
     def get(self, application_id: str, profile_id: str) -> dict:
@@ -144,7 +151,7 @@ class Profiles:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
 
         if filter_expression:
@@ -283,7 +290,7 @@ class ProfilePermissions:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
 
         if filter_expression:
@@ -304,7 +311,7 @@ class ProfilePermissions:
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(),
             'query': 'available'
         }
         return self.britive.get(f'{self.base_url}/{profile_id}/permissions', params=params)
@@ -375,7 +382,7 @@ class ProfileIdentities:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
 
         if filter_expression:
@@ -396,7 +403,7 @@ class ProfileIdentities:
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(),
             'query': 'available'
         }
         return self.britive.get(f'{self.base_url}/{profile_id}/users', params=params)
@@ -461,7 +468,7 @@ class ProfileTags:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
 
         if filter_expression:
@@ -482,7 +489,7 @@ class ProfileTags:
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(),
             'query': 'available'
         }
         return self.britive.get(f'{self.base_url}/{profile_id}/user-tags', params=params)
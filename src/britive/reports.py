@@ -1,15 +1,90 @@
 import csv as csv_lib
-from io import StringIO
+import itertools
 import json
+from .helpers import columnar
+
+
+# a cell can only decode to a JSON value (number, bool, null, list, dict or quoted string) if it starts with one of
+# these characters - anything else is left as a string without paying for a failed json.loads()
+_json_start_characters = frozenset('{["-0123456789tfn')
 
 
 def _json_loads(value):
+    if not value or value[0] not in _json_start_characters:
+        return value
     try:
         return json.loads(value)
-    except:
+    except ValueError:
         return value
 
 
+def _lines(chunks):
+    # re-split a stream of text chunks on newlines so the csv module can consume it as it arrives
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line + '\n'
+    if buffer:
+        yield buffer
+
+
+def _parse(chunks, sample_size=100):
+    """
+    Parse a stream of CSV text chunks, decoding JSON values in each cell.
+
+    Whether a column holds JSON values is decided once from the first `sample_size` rows instead of attempting to
+    decode every cell. Columns in which no sampled value decodes are returned as strings. Columns which were empty in
+    every sampled row are decoded cell by cell.
+
+    :return: Tuple of (fieldnames, generator of rows as lists).
+    """
+
+    reader = csv_lib.reader(_lines(chunks), quoting=csv_lib.QUOTE_MINIMAL)
+    fieldnames = next(reader, [])
+    sample = []
+    for row in reader:
+        if row:  # skip blank lines
+            sample.append(row)
+        if len(sample) >= sample_size:
+            break
+
+    decode = []
+    for index in range(len(fieldnames)):
+        values = [row[index] for row in sample if len(row) > index and row[index]]
+        if not values or any(_json_loads(value) is not value for value in values):
+            decode.append(index)
+
+    def rows():
+        for row in itertools.chain(sample, reader):
+            if not row:
+                continue
+            for index in decode:
+                if index < len(row) and row[index]:
+                    row[index] = _json_loads(row[index])
+            yield row
+
+    return fieldnames, rows()
+
+
+def _records(chunks):
+    fieldnames, rows = _parse(chunks)
+    width = len(fieldnames)
+    for row in rows:
+        if len(row) < width:
+            row += [None] * (width - len(row))
+        yield dict(zip(fieldnames, row))
+
+
+def _columns(chunks) -> dict:
+    fieldnames, rows = _parse(chunks)
+    builder = columnar.ColumnBuilder(fieldnames)
+    for row in rows:
+        builder.append_row(row)
+    return builder.columns
+
+
 class Reports:
     def __init__(self, britive):
         self.britive = britive
@@ -27,31 +102,56 @@ class Reports:
         }
         return self.britive.get(self.base_url, params=params)
 
-    def run(self, report_id: str, csv: bool = False, filter_expression: str = None) -> any:
+    def run(self, report_id: str, csv: bool = False, filter_expression: str = None, stream: bool = False,
+            output_format: str = 'records') -> any:
         """
         Run a report.
 
+        The report is downloaded as CSV and, unless `csv=True`, parsed as the response arrives. Whether a column holds
+        JSON values (numbers, booleans, lists, etc.) is decided from the first 100 rows; columns in which none of those
+        values decode as JSON are returned as strings.
+
+        `output_format` options (only applicable when `csv=False`):
+
+            - records: A list where each item is a dict representing a row of data.
+            - columns: A dict of column name to list of values. Considerably smaller than `records` for large reports.
+            - arrow: A `pyarrow.Table`. Requires the `pyarrow` package.
+            - numpy: A dict of column name to `numpy.ndarray`. Requires the `numpy` package.
+
+        Column oriented output can be written to a Parquet or Feather file with `britive.helpers.columnar.write`.
+
         :param report_id: The ID of the report.
         :param csv: If True the result will be returned as a CSV string. If False (default) the result will be returned
-            as a list where each time in the list is a dict representing the row of data.
+            in the format specified by `output_format`.
         :param filter_expression: The filter to apply to the report. It is left to the caller to provide a syntactically
             correct filter expression string.
-        :return: CSV string or list.
+        :param stream: If True a generator is returned instead of holding the entire report in memory. The generator
+            yields a dict per row or, if `csv=True`, chunks of the CSV string. Only applicable when
+            `output_format='records'`. Defaults to False.
+        :param output_format: The format of the result when `csv=False`. Defaults to `records`.
+        :return: CSV string, list, generator or column oriented data as described above.
+        :raises: ValueError - If `output_format` is invalid, or `stream=True` with an `output_format` other than
+            `records`.
         """
 
+        if output_format not in columnar.output_formats:
+            raise ValueError(f'invalid output_format {output_format}')
+        if stream and not csv and output_format != 'records':
+            raise ValueError(f'stream is not supported with output_format {output_format}')
+
         params = {}
         if filter_expression:
             params['filter'] = filter_expression
-        csv_results = self.britive.get(f'{self.base_url}/{report_id}/csv', params=params)
+        url = f'{self.base_url}/{report_id}/csv'
 
         # convert csv to json - issue is that JSON response has max of 1k records returned so have to use CSV
         # as the base and convert to dict if the client asked for dict
         if csv:
-            return csv_results
-        else:
-            dict_results = []
-            for row in csv_lib.DictReader(StringIO(csv_results), quoting=csv_lib.QUOTE_MINIMAL):
-                dict_results.append({k: _json_loads(v) for k, v in row.items()})
-            return dict_results
-
-
+            if stream:
+                return self.britive.iter_text(url, params=params)
+            return self.britive.get(url, params=params)
+        chunks = self.britive.iter_text(url, params=params)
+        if output_format != 'records':
+            return columnar.convert(_columns(chunks), output_format)
+        rows = _records(chunks)
+        return rows if stream else list(rows)
@@ -50,7 +50,7 @@ class Scans:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
         if filter_expression:
             params['filter'] = filter_expression
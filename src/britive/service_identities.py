@@ -11,23 +11,29 @@ class ServiceIdentities:
         self.base_url = f'{self.britive.base_url}/users'
         self.custom_attributes = CustomAttributes(self)
 
-    def list(self, filter_expression: str = None) -> list:
+    def list(self, filter_expression: str = None, stream: bool = False, page_size: int = None) -> list:
         """
         Provide an optionally filtered list of all service identities.
 
         :param filter_expression: filter list of users based on name, status, or role. The supported operators
              are 'eq' and 'co'. Example: 'name co "Smith"'
+        :param stream: If True a generator is returned which yields service identity records as each page of results is
+            retrieved instead of a list of all service identity records. Defaults to False.
+        :param page_size: The number of records to request per page. Defaults to the page size configured on the
+            client, or 100 if none is configured.
         :return: List of service identity records
         """
 
         params = {
             'type': 'ServiceIdentity',
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size(page_size)
         }
         if filter_expression:
             params['filter'] = filter_expression
 
+        if stream:
+            return self.britive.iter_get(self.base_url, params)
         return self.britive.get(self.base_url, params)
 
     def get(self, service_identity_id: str) -> dict:
@@ -67,22 +73,28 @@ class ServiceIdentities:
 
         return self.list(filter_expression=f'status eq "{status}"')
 
-    def search(self, search_string: str) -> list:
+    def search(self, search_string: str, stream: bool = False, page_size: int = None) -> list:
         """
         Search all user fields for the given `search_string` and returns
         a list of matched service identities.
 
         :param search_string:
+        :param stream: If True a generator is returned which yields service identity records as each page of results is
+            retrieved instead of a list of all service identity records. Defaults to False.
+        :param page_size: The number of records to request per page. Defaults to the page size configured on the
+            client, or 100 if none is configured.
         :return: List of user records
         """
 
         params = {
             'type': 'ServiceIdentity',
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(page_size),
             'searchText': search_string
         }
 
+        if stream:
+            return self.britive.iter_get(self.base_url, params)
         return self.britive.get(self.base_url, params)
 
     def create(self, **kwargs) -> dict:
@@ -17,14 +17,8 @@ class TagMembershipRules:
         if operator.lower() not in ['contains', 'is']:
             raise ValueError('invalid operator provided.')
 
-        # first get list of existing identity attributes and build some helpers
-        existing_attrs = [attr for attr in self.britive.identity_attributes.list()]
-        existing_attr_ids = [attr['id'] for attr in existing_attrs]
-        attrs_by_name = {attr['name']: attr['id'] for attr in existing_attrs}
-
-        attribute_id = attribute_id_or_name
-        if attribute_id not in existing_attr_ids:
-            attribute_id = attrs_by_name.get(attribute_id_or_name, None)
+        # convert names to ids via the cached catalog of identity attributes
+        attribute_id = self.britive.identity_attributes.resolve_id(attribute_id_or_name)
         if not attribute_id:
             raise ValueError(f'identity attribute name {attribute_id_or_name} not found.')
 
@@ -89,7 +83,7 @@ class TagMembershipRules:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
         return self.britive.get(f'{self.base_url}/{tag_id}/matched-users', params=params)
 
@@ -142,7 +136,7 @@ class Tags:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
         if filter_expression:
             params['filter'] = filter_expression
@@ -160,7 +154,7 @@ class Tags:
 
         params = {
             'page': 0,
-            'size': 100,
+            'size': self.britive.resolve_page_size(),
             'searchText': search_string
         }
 
@@ -178,7 +172,7 @@ class Tags:
 
         params = {
             'page': 0,
-            'size': 100
+            'size': self.britive.resolve_page_size()
         }
         if filter_expression:
             params['filter'] = filter_expression
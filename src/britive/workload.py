@@ -39,18 +39,13 @@ class Workload:
             return self.britive.get(f'{self.base_url}/{workload_identity_provider_id}')
 
         def _build_attributes_map_list(self, attributes_map: dict):
-            # first get list of existing custom identity attributes and build some helpers
-            existing_attrs = [attr for attr in self.britive.identity_attributes.list() if not attr['builtIn']]
-            existing_attr_ids = [attr['id'] for attr in existing_attrs]
-            attrs_by_name = {attr['name']: attr['id'] for attr in existing_attrs}
-
-            # for each attributeMap key/value provided ensure we convert to ID and build the list
+            # for each attributeMap key/value provided ensure we convert to ID (via the cached catalog of identity
+            # attributes) and build the list
             attrs_list = []
-            for idp_attr, custom_identity_attribute in attributes_map.items():
-                if custom_identity_attribute not in existing_attr_ids:
-                    custom_identity_attribute = attrs_by_name.get(custom_identity_attribute, None)
+            for idp_attr, id_or_name in attributes_map.items():
+                custom_identity_attribute = self.britive.identity_attributes.resolve_id(id_or_name, custom_only=True)
                 if not custom_identity_attribute:
-                    raise ValueError(f'custom identity attribute name {custom_identity_attribute} not found.')
+                    raise ValueError(f'custom identity attribute name {id_or_name} not found.')
                 attrs_list.append(
                     {
                         'idpAttr': idp_attr,
@@ -290,13 +285,10 @@ class Workload:
                                  'should be provided')
 
             if custom_identity_attribute_name:
-                found = False
-                for attr in self.britive.identity_attributes.list():
-                    if attr['name'] == custom_identity_attribute_name:
-                        custom_identity_attribute_id = attr['id']
-                        found = True
-                        break
-                if not found:
+                custom_identity_attribute_id = self.britive.identity_attributes.resolve_id(
+                    custom_identity_attribute_name
+                )
+                if not custom_identity_attribute_id:
                     raise ValueError(f'custom_identity_attribute_name value of {custom_identity_attribute_name} '
                                      f'not found.')
 
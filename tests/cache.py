@@ -1,8 +1,12 @@
+import contextlib
 import functools
+import json as native_json
 import pytest
 import os
 import string
 import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # don't worry about these invalid references - it will be fixed up if we are running local tests
 # vs running it through tox
@@ -43,6 +47,51 @@ def cleanup(resource):
         os.remove(file)
 
 
+@contextlib.contextmanager
+def local_server(do_get):
+    # serve GET requests locally (for behavior a tenant cannot be made to exhibit on demand, like slow responses) -
+    # `do_get` is called with the request handler and returns a (status code, JSON body) tuple, or None to close the
+    # connection without a response
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            result = do_get(self)
+            if result is None:
+                self.close_connection = True
+                return
+            status, body = result
+            content = native_json.dumps(body).encode()
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            except OSError:  # the client gave up on the request
+                pass
+
+    ThreadingHTTPServer.daemon_threads = True
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f'127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def local_client(host, **kwargs):
+    # a client of a `local_server` - plain http and no backoff between retries so tests run quickly
+    client = Britive(tenant=host, token='local', query_features=False, validate_tenant=False, **kwargs)
+    client.base_url = f'http://{host}/api'
+    adapter = client.session.get_adapter('https://')
+    adapter.max_retries = adapter.max_retries.new(backoff_factor=0)
+    client.session.mount('http://', adapter)
+    return client
+
+
 def cached_resource(name):
     def decorator_cached_resource(func):
         @functools.wraps(func)
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import time
+from britive.helpers.feature_caches import MemoryFeatureCache
+from britive.helpers.tenant_cache import tenants
+from .cache import *
+
+
+def test_import_is_lazy():
+    script = 'import sys, britive.britive; print(",".join(sorted(sys.modules)))'
+    modules = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    modules = modules.strip().split(',')
+    assert 'pkg_resources' not in modules
+    assert 'britive.users' not in modules
+    assert 'britive.secrets_manager' not in modules
+
+
+def test_construction_time():
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        client = Britive(tenant=britive.tenant, query_features=False)
+        timings.append(time.perf_counter() - start)
+        assert 'users' not in vars(client)  # resources are constructed on first access
+    assert min(timings) < 0.05
+
+
+def test_resources_constructed_on_access():
+    client = Britive(tenant=britive.tenant, query_features=False)
+    assert client.users is client.users
+    assert 'users' in dir(client)
+    assert client.profiles.version == 2
+
+
+def test_feature_cache():
+    cache = MemoryFeatureCache()
+    first = Britive(tenant=britive.tenant, feature_cache=cache)
+    assert first.feature_flags == britive.feature_flags
+    second = Britive(tenant=britive.tenant, feature_cache=cache)
+    assert second.profiles.version == britive.profiles.version
+    assert 'GET /api/features' not in second.metrics.snapshot()  # served from the cache
+
+
+def test_tenant_resolution_cached():
+    assert tenants.get(os.environ['BRITIVE_TENANT']) == britive.tenant
+    client = Britive(tenant=britive.tenant, query_features=False, validate_tenant=False)
+    assert client.tenant == britive.tenant
@@ -11,3 +11,11 @@ def test_list():
 def test_create(cached_identity_attribute):
     assert isinstance(cached_identity_attribute, dict)
 
+
+
+def test_resolve_id(cached_identity_attribute):
+    attribute_id = cached_identity_attribute['id']
+    assert britive.identity_attributes.resolve_id(cached_identity_attribute['name']) == attribute_id
+    assert britive.identity_attributes.resolve_id(attribute_id, custom_only=True) == attribute_id
+    assert britive.identity_attributes.catalog_cache.get('catalog') is not None
+    assert britive.identity_attributes.resolve_id('Email', custom_only=True) is None  # built in attribute
@@ -1,3 +1,8 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+from britive.helpers.circuit_breaker import CircuitBreakers
+from britive.helpers.hedging import HedgingPolicy
 from .cache import *  # will also import some globals like `britive`
 
 user_keys = [
@@ -32,6 +37,122 @@ def test_list(cached_user):
     assert cached_user['userId'] in [x['userId'] for x in response]
 
 
+def test_list_concurrent_pagination():
+    sequential = britive.users.list()
+    try:
+        britive.pagination_concurrency = 4
+        concurrent = britive.users.list()
+    finally:
+        britive.pagination_concurrency = 1
+    assert concurrent == sequential
+
+
+def test_list_page_size():
+    assert britive.users.list(page_size=10) == britive.users.list()
+
+
+def test_list_adaptive_page_size():
+    adaptive = Britive(query_features=False, page_size='adaptive')
+    assert adaptive.users.list() == britive.users.list()
+    assert adaptive.page_size.size >= 100
+
+
+def test_list_adaptive_page_size_read_timeout():
+    sizes = []
+
+    def users(request):
+        params = parse_qs(urlparse(request.path).query)
+        page, size = int(params['page'][0]), int(params['size'][0])
+        sizes.append(size)
+        if size > 50:
+            time.sleep(0.5)  # larger pages take longer than the read timeout of the client
+        data = [{'userId': str(i)} for i in range(page * size, min((page + 1) * size, 120))]
+        return 200, {'count': 120, 'page': page, 'size': size, 'data': data}
+
+    with local_server(users) as host:
+        client = local_client(host, page_size='adaptive', timeout=0.3)
+        assert [u['userId'] for u in client.users.list()] == [str(i) for i in range(120)]
+        assert client.metrics.snapshot()['GET /api/users']['errors'] >= 1
+        assert sizes[0] == 100 and 50 in sizes  # shrunk rather than failing with ConnectionError
+
+
+def test_list_stream(cached_user):
+    response = britive.users.list(stream=True)
+    assert not isinstance(response, list)
+    users = list(response)
+    assert len(users) == len(britive.users.list())
+    assert cached_user['userId'] in [x['userId'] for x in users]
+
+
+def test_list_metrics():
+    britive.metrics.reset()
+    britive.users.list()
+    stats = britive.metrics.snapshot()['GET /api/users']
+    assert stats['calls'] == 1
+    assert stats['requests'] == stats['pages']['sum'] >= 1
+    assert stats['status_codes']['200'] == stats['requests']
+    assert stats['bytes_received'] > 0
+    assert 'britive_requests_total{method="GET",endpoint="/api/users",status="200"}' in britive.metrics.to_prometheus()
+
+
+def test_list_hooks():
+    events = []
+    callback = britive.hooks.register('on_page', events.append)
+    try:
+        users = britive.users.list()
+    finally:
+        britive.hooks.unregister('on_page', callback)
+    assert len(events) >= 1
+    assert all(event['sdk_method'] == 'users.list' for event in events)
+    assert [event['page'] for event in events] == list(range(1, len(events) + 1))
+    assert sum(event['records'] for event in events) == len(users)
+
+
+def test_list_rate_limited():
+    client = Britive(tenant=britive.tenant, query_features=False, rate_limit=5)
+    assert client.rate_limiter is Britive(tenant=britive.tenant, query_features=False, rate_limit=5).rate_limiter
+    assert isinstance(client.users.list(), list)
+    assert client.rate_limiter.rate <= 5
+
+
+def test_list_deadline():
+    client = Britive(tenant=britive.tenant, query_features=False, timeout=(5, 30))
+    with client.deadline(60):
+        assert isinstance(client.users.list(), list)
+    with pytest.raises(exceptions.DeadlineExceeded):
+        with client.deadline(0.001):
+            client.users.list()
+
+
+def test_list_hedged():
+    hedging = HedgingPolicy(endpoints=['/api/users*'], minimum_samples=1)
+    client = Britive(tenant=britive.tenant, query_features=False, hedging=hedging)
+    for _ in range(3):
+        assert isinstance(client.users.list(), list)
+    assert hedging.won <= hedging.hedged <= hedging.burst
+
+
+def test_list_circuit_breakers():
+    breakers = CircuitBreakers()
+    client = Britive(tenant=britive.tenant, query_features=False, circuit_breakers=breakers)
+    assert isinstance(client.users.list(), list)
+    assert breakers.states()['users'] == 'closed'
+
+
+def test_list_shared_across_threads():
+    client = Britive(tenant=britive.tenant, query_features=False, pool_maxsize=16, pool_block=True)
+    params = {'page': 0, 'size': 5}
+    expected = client.get(f'{client.base_url}/users', params=params)
+
+    def list_users(_):
+        return client.get(f'{client.base_url}/users', params=params)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(list_users, range(32)))
+    assert params == {'page': 0, 'size': 5}  # pagination state is never kept in the caller's parameters
+    assert all(len(result) == len(expected) for result in results)
+
+
 def test_get(cached_user):
     user = britive.users.get(cached_user['userId'])
     assert isinstance(user, dict)
@@ -158,5 +279,23 @@ def test_remove_custom_identity_attributes(cached_user, cached_identity_attribut
     assert len(attributes) == 0
 
 
+def test_bulk_custom_identity_attributes(cached_user, cached_identity_attribute):
+    value = f'test-attr-value-{random.randint(0, 1000000)}'
+    updates = {
+        cached_user['userId']: {cached_identity_attribute['name']: value},
+        'not-a-user-id': {cached_identity_attribute['name']: value}
+    }
+    results = britive.users.custom_attributes.bulk_add(updates, max_workers=2, requests_per_second=5)
+    assert results['succeeded'] == [cached_user['userId']]
+    assert list(results['failed'].keys()) == ['not-a-user-id']
+    attributes = britive.users.custom_attributes.get(principal_id=cached_user['userId'], as_dict=True)
+    assert attributes[cached_identity_attribute['id']] == value
+
+    updates = iter([(cached_user['userId'], {cached_identity_attribute['id']: value})])
+    results = britive.users.custom_attributes.bulk_remove(updates)
+    assert results == {'succeeded': [cached_user['userId']], 'failed': {}}
+    assert len(britive.users.custom_attributes.get(principal_id=cached_user['userId'])) == 0
+
+
 
 
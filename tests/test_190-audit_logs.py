@@ -1,4 +1,7 @@
 from .cache import *  # will also import some globals like `britive`
+from datetime import datetime, timedelta
+from britive.helpers.cursor_stores import FileCursorStore
+from britive.helpers.response_cache import MemoryResponseCache
 
 
 def test_fields():
@@ -7,6 +10,14 @@ def test_fields():
     assert len(fields.keys()) == 18
 
 
+def test_fields_cached():
+    cache = MemoryResponseCache()
+    client = Britive(tenant=britive.tenant, query_features=False, response_cache=cache)
+    assert client.audit_logs.fields() == client.audit_logs.fields()
+    assert cache.hits == 1
+    assert client.metrics.snapshot()['GET /api/logs/fields']['requests'] == 1
+
+
 def test_operators():
     operators = britive.audit_logs.operators()
     assert isinstance(operators, dict)
@@ -20,6 +31,53 @@ def test_query_json():
     assert len(events) % 100 != 0  # v2.8.1 - adding check due to pagination bug not including the last page
 
 
+def test_query_json_stream():
+    to_time = datetime.utcnow()
+    from_time = to_time - timedelta(days=1)
+    events = britive.audit_logs.query(from_time=from_time, to_time=to_time, stream=True)
+    assert not isinstance(events, list)
+    assert list(events) == britive.audit_logs.query(from_time=from_time, to_time=to_time)
+
+
+def test_query_columns():
+    to_time = datetime.utcnow()
+    from_time = to_time - timedelta(days=1)
+    columns = britive.audit_logs.query(from_time=from_time, to_time=to_time, output_format='columns')
+    events = britive.audit_logs.query(from_time=from_time, to_time=to_time)
+    assert isinstance(columns, dict)
+    assert all(len(values) == len(events) for values in columns.values())
+    assert columns['timestamp'] == [event['timestamp'] for event in events]
+
+
+def test_export():
+    to_time = datetime.utcnow()
+    from_time = to_time - timedelta(days=1)
+    exported = list(britive.audit_logs.export(from_time=from_time, to_time=to_time, window=timedelta(hours=2)))
+    queried = britive.audit_logs.query(from_time=from_time, to_time=to_time)
+    assert len(exported) == len(queried)
+    timestamps = [event['timestamp'] for event in exported]
+    assert timestamps == sorted(timestamps)
+
+
+def test_export_to_file(tmp_path):
+    file = str(tmp_path / 'audit.jsonl')
+    count = britive.audit_logs.export(window=timedelta(days=1), file=file)
+    with open(file) as f:
+        assert len(f.readlines()) == count
+
+
+def test_tail(tmp_path):
+    store = FileCursorStore(str(tmp_path / 'cursors.json'))
+    first = britive.audit_logs.tail(cursor_store=store, from_time=datetime.utcnow() - timedelta(days=1))
+    assert isinstance(first, list)
+    seen = {event['timestamp'] for event in first}
+    second = britive.audit_logs.tail(cursor_store=store)
+    assert isinstance(second, list)
+    assert not [event for event in second if event in first]
+    assert store.get(f'{britive.tenant}|default') is not None
+    assert all(event['timestamp'] >= max(seen) for event in second) if seen else True
+
+
 def test_query_csv():
     csv = britive.audit_logs.query(csv=True)
     assert '"timestamp","actor.display_name"' in csv
@@ -27,3 +27,35 @@ def test_run_csv():
     assert isinstance(report, str)
     assert 'application,environment,applicationStatus' in report
 
+
+
+def test_run_json_stream():
+    for report in britive.reports.list():
+        if report['name'] == 'Profile Last Access':
+            report_id = report['reportId']
+
+    report = britive.reports.run(report_id=report_id, stream=True)
+    assert not isinstance(report, list)
+    rows = list(report)
+    assert rows == britive.reports.run(report_id=report_id)
+
+
+def test_run_csv_stream():
+    for report in britive.reports.list():
+        if report['name'] == 'Profile Last Access':
+            report_id = report['reportId']
+
+    report = ''.join(britive.reports.run(report_id=report_id, csv=True, stream=True))
+    assert 'application,environment,applicationStatus' in report
+
+
+def test_run_columns():
+    for report in britive.reports.list():
+        if report['name'] == 'Profile Last Access':
+            report_id = report['reportId']
+
+    rows = britive.reports.run(report_id=report_id)
+    columns = britive.reports.run(report_id=report_id, output_format='columns')
+    assert isinstance(columns, dict)
+    assert list(columns.keys()) == list(rows[0].keys())
+    assert columns['application'] == [row['application'] for row in rows]
@@ -1,5 +1,7 @@
 from .cache import *  # will also import some globals like `britive`
 import json
+import time
+from britive.helpers.polling import ExponentialBackoff, FixedInterval
 
 
 def test_whoami():
@@ -8,6 +10,34 @@ def test_whoami():
     print(json.dumps(me, indent=2, default=str))
 
 
+def test_polling_exponential_backoff():
+    delays = ExponentialBackoff(minimum=0.05, maximum=1, multiplier=2, jitter=0.2).delays()
+    delays = [next(delays) for _ in range(10)]
+    assert 0.05 <= delays[0] <= 0.06  # jitter never takes a wait below the minimum
+    assert delays[3] > delays[0]  # grows with each status check
+    assert all(0.05 <= delay <= 1 for delay in delays)
+    assert delays[-1] >= 0.8  # settles at the maximum, within the jitter
+
+
+def test_polling_never_sleeps_past_timeout():
+    poll = FixedInterval(10).start(timeout=0.2, maximum=5)
+    assert poll.next_delay() <= 0.2
+    start = time.monotonic()
+    poll.sleep()
+    assert time.monotonic() - start < 1
+    assert poll.expired
+    assert poll.remaining == 0
+
+
+def test_polling_respects_deadline():
+    with britive.deadline(0.1):
+        poll = FixedInterval(10).start()
+        assert poll.next_delay() <= 0.1
+        time.sleep(0.15)
+        with pytest.raises(exceptions.DeadlineExceeded):
+            poll.next_delay()
+
+
 def test_list_profiles():
     profiles = britive.my_access.list_profiles()
     assert isinstance(profiles, list)
@@ -35,6 +65,38 @@ def test_checkout_again(cached_profile, cached_environment):
     assert 'credentials' in response.keys()
 
 
+@pytest.mark.skipif(scan_skip, reason=scan_skip_message)
+def test_checkout_many(cached_profile, cached_environment):
+    responses = list(britive.my_access.checkout_many(
+        profiles=[{'profile_id': cached_profile['papId'], 'environment_id': cached_environment['id']}]
+    ))
+
+    assert len(responses) == 1
+    assert responses[0]['papId'] == cached_profile['papId']
+    assert responses[0]['status'] == 'checkedOut'
+    assert 'credentials' in responses[0].keys()
+
+
+@pytest.mark.skipif(scan_skip, reason=scan_skip_message)
+def test_checkout_credential_cache(cached_profile, cached_environment):
+    britive.my_access.enable_credential_cache(safety_margin=60, default_ttl=60)
+    try:
+        first = britive.my_access.checkout(
+            profile_id=cached_profile['papId'],
+            environment_id=cached_environment['id'],
+            include_credentials=True
+        )
+        second = britive.my_access.checkout(
+            profile_id=cached_profile['papId'],
+            environment_id=cached_environment['id'],
+            include_credentials=True
+        )
+        assert second['credentials'] == first['credentials']
+        assert britive.my_access.credentials(transaction_id=first['transactionId']) == first['credentials']
+    finally:
+        britive.my_access.disable_credential_cache()
+
+
 @pytest.mark.skipif(scan_skip, reason=scan_skip_message)
 def test_list_checked_out_profiles():
     profiles = britive.my_access.list_checked_out_profiles()
@@ -76,6 +138,22 @@ def test_checkin_by_name(cached_profile, cached_environment, cached_application)
     cleanup('checked-out-profile-by-name')
 
 
+def test_entitlement_cache():
+    app = britive.my_access.list_profiles()[0]
+    profile = app['profiles'][0]
+    environment = profile['environments'][0]
+    names = {
+        'profile_name': profile['profileName'],
+        'environment_name': environment['environmentName'],
+        'application_name': app['appName']
+    }
+    britive.my_access.invalidate_entitlements()
+    ids = britive.my_access._get_profile_and_environment_ids_given_names(**names)
+    assert ids == {'profile_id': profile['profileId'], 'environment_id': environment['environmentId']}
+    assert britive.my_access.entitlement_cache.get('index') is not None
+    assert britive.my_access._get_profile_and_environment_ids_given_names(**names) == ids
+
+
 def test_frequents():
     profiles = britive.my_access.frequents()
     assert isinstance(profiles, list)
@@ -0,0 +1,82 @@
+from .cache import *  # will also import some globals like `britive`
+import asyncio
+import socket
+from britive import async_britive as async_britive_module
+from britive.async_britive import AsyncBritive
+
+
+def run(coroutine_func):
+    async def wrapper():
+        async with AsyncBritive() as async_britive:
+            return await coroutine_func(async_britive)
+    return asyncio.run(wrapper())
+
+
+def test_features():
+    feature_flags = run(lambda b: b.load_features())
+    assert feature_flags == britive.feature_flags
+
+
+def test_users_list():
+    users = run(lambda b: b.users.list())
+    assert isinstance(users, list)
+    assert len(users) == len(britive.users.list())
+
+
+def test_concurrent_requests():
+    async def concurrent(b):
+        return await asyncio.gather(
+            b.users.list(),
+            b.my_access.whoami(),
+            b.audit_logs.fields()
+        )
+
+    users, me, fields = run(concurrent)
+    assert isinstance(users, list)
+    assert isinstance(me, dict)
+    assert isinstance(fields, dict)
+
+
+def test_nested_resource():
+    consumers = run(lambda b: b.system.consumers.list())
+    assert isinstance(consumers, list)
+
+
+def local_run(host, coroutine_func):
+    async def wrapper():
+        async with AsyncBritive(tenant=host, token='local', query_features=False, validate_tenant=False) as client:
+            client.base_url = client._sync.base_url = f'http://{host}/api'
+            return await coroutine_func(client)
+    return asyncio.run(wrapper())
+
+
+def test_transport_errors_retried(monkeypatch):
+    monkeypatch.setattr(async_britive_module, 'retry_backoff_factor', 0)
+    requests = []
+
+    def flaky(request):
+        requests.append(request.path)
+        return None if len(requests) < 3 else (200, {'ok': True})  # drop the connection of the first two requests
+
+    async def get(client):
+        result = await client.get(f'{client.base_url}/flaky')
+        return result, client.metrics.snapshot()['GET /api/flaky']['retries']
+
+    with local_server(flaky) as host:
+        assert local_run(host, get) == ({'ok': True}, 2)
+    assert len(requests) == 3
+
+
+def test_connect_errors_retried(monkeypatch):
+    monkeypatch.setattr(async_britive_module, 'retry_backoff_factor', 0)
+    with socket.socket() as s:  # a port nothing is listening on
+        s.bind(('127.0.0.1', 0))
+        host = f'127.0.0.1:{s.getsockname()[1]}'
+
+    async def post(client):
+        try:
+            await client.post(f'{client.base_url}/closed', json={})
+        except Exception as e:
+            return type(e).__name__, client.metrics.snapshot()['POST /api/closed']['retries']
+
+    assert local_run(host, post) == ('ConnectError', async_britive_module.retry_total)